@@ -11,7 +11,7 @@ import os
 import tkinter as tk
 from tkinter import ttk
 from ui_style import STYLE_CONFIG, apply_global_style
-import requests
+import http_client
 
 # from database import init_db_schema
 from pantryapp.pantry_app import PantryPage
@@ -253,7 +253,7 @@ class HomeDashboard(ttk.Frame):
         btn_store.grid(row=2, column=1, padx=14, pady=(14, 0), ipadx=8, ipady=tile_h)
 
         # RIGHT SIDE: Alert List
-        alert_frame = ttk.LabelFrame(main_content, text="Chore Alerts", padding=10)
+        alert_frame = ttk.LabelFrame(main_content, text="Alerts", padding=10)
         alert_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(30, 0))
 
         # Listbox for alerts
@@ -323,8 +323,12 @@ class HomeDashboard(ttk.Frame):
         try:
             CITY = os.getenv("WEATHER_CITY")
             API_KEY = os.getenv("WEATHER_API_KEY")
-            url = f"https://api.openweathermap.org/data/2.5/weather?q={CITY}&appid={API_KEY}&units=imperial"
-            resp = requests.get(url, timeout=8)
+            resp = http_client.get(
+                "https://api.openweathermap.org/data/2.5/weather",
+                params={"q": CITY, "appid": API_KEY, "units": "imperial"},
+                endpoint="openweather current",
+                timeout=8,
+            )
             resp.raise_for_status()
             data = resp.json()
             temp = data['main']['temp']
@@ -356,6 +360,26 @@ class HomeDashboard(ttk.Frame):
         except Exception as e:
             self.alert_list.insert(tk.END, "No alerts available.")
 
+        self._add_pantry_alerts()
+
+    def _add_pantry_alerts(self):
+        """Appends pantry low-stock alerts (flags maintained by the pantry model)."""
+        try:
+            from pantryapp.pantry_model import get_refill_alerts
+            alerts = get_refill_alerts()
+        except Exception:
+            return
+
+        for a in alerts:
+            on_hand = f"{float(a['on_hand']):g}"
+            min_stock = "?" if a["min_stock"] is None else f"{float(a['min_stock']):g}"
+            if a["kind"] == "location":
+                status = f"🛒 {a['name']} running low ({on_hand}/{min_stock} items)"
+            else:
+                status = f"🛒 Buy {a['name']} ({on_hand} left, min {min_stock})"
+            self.alert_list.insert(tk.END, status)
+            self.alert_list.itemconfig(tk.END, foreground=STYLE_CONFIG["accent_red_dark"])
+
 # class ChoresPage(ttk.Frame):
 #     def __init__(self, master: tk.Misc, *, on_open):
 #         super().__init__(master)
@@ -421,6 +445,8 @@ def main() -> None:
     #init_db_schema()
     app = HomeApp()
     app.mainloop()
+    if os.getenv("HTTP_METRICS"):
+        print(http_client.format_metrics())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -13,7 +13,7 @@ from database import get_connection, engine
 import json
 from urllib.request import urlopen
 from urllib.parse import urlencode
-import requests
+import http_client
 import psycopg2
 from psycopg2 import sql
 import io
@@ -65,8 +65,8 @@ class RecipeManager:
         return session.query(Person).all()
     
     def fetch_recipe(self, item_name):
-        url = f'https://www.themealdb.com/api/json/v1/1/search.php?s={item_name}'
-        response = requests.get(url)
+        url = 'https://www.themealdb.com/api/json/v1/1/search.php'
+        response = http_client.get(url, params={'s': item_name}, endpoint='themealdb search')
         response.raise_for_status()
         data = response.json()
         if not data['meals']:
@@ -89,7 +89,7 @@ class RecipeManager:
     def fetch_image_as_jpeg(self, meal, url):
         if not url:
             return None
-        response = requests.get(url)
+        response = http_client.get(url, endpoint='themealdb image')
         response.raise_for_status()
         self.load_recipe_to_db(meal, response.content)
 
@@ -110,8 +110,8 @@ class RecipeManager:
         session.commit()
 
     def fetch_random_by_category(self, category, parent=None):
-        url = f'https://www.themealdb.com/api/json/v1/1/filter.php?c={category}'
-        response = requests.get(url)
+        url = 'https://www.themealdb.com/api/json/v1/1/filter.php'
+        response = http_client.get(url, params={'c': category}, endpoint='themealdb category')
         response.raise_for_status()
         data = response.json()
         if not data['meals']:
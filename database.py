@@ -26,17 +26,34 @@ def _get_sqlite_connection():
         return None
 
 
+def get_catalog_connection():
+    """Connection to the local OpenFoodFacts slim DB (products table), or None."""
+    return _get_sqlite_connection()
+
+
+def _connect_postgres():
+    return psycopg2.connect(
+        host="localhost",
+        database="homeappdb",
+        user="postgres",
+        password="password",
+        port="5432" # Default PostgreSQL port
+    )
+
+
+def get_postgres_connection():
+    """Connection to the household Postgres DB with no SQLite fallback, or None."""
+    try:
+        return _connect_postgres()
+    except psycopg2.Error as e:
+        print(f"Postgres error: {e}")
+        return None
+
+
 def get_connection():
     # Setup a connection to the PostgreSQL database
     try:
-        connection = psycopg2.connect(
-            host="localhost",
-            database="homeappdb",
-            user="postgres",
-            password="password",
-            port="5432" # Default PostgreSQL port
-        )
-        return connection
+        return _connect_postgres()
     except psycopg2.Error as e:
         print(f"Postgres error, falling back to SQLite: {e}")
         return _get_sqlite_connection()
@@ -0,0 +1,298 @@
+# http_client.py
+#
+# Shared HTTP transport for every external API the Home App talks to
+# (Kroger, TheMealDB, UPCItemDB, OpenWeather).
+#
+#   - one requests.Session per host, so connections are kept alive and pooled
+#   - default (connect, read) timeouts on every call
+#   - 429 / 5xx responses and connection failures are retried with jittered
+#     exponential backoff (Retry-After is honoured on 429, within a cap)
+#   - per-endpoint counters: calls, errors, retries and latency
+#
+# Usage:
+#     import http_client
+#     r = http_client.get(url, params={...}, endpoint="themealdb search")
+#
+# `endpoint` names the metric bucket; it defaults to "METHOD host/path", so
+# pass one for URLs whose path varies per call (image URLs and the like).
+# `cancel` takes a threading.Event; once set, no further attempt or backoff
+# wait is made and the call raises Cancelled.
+#
+# Record / replay (HTTP_MODE=record|replay, HTTP_CASSETTE_DIR=<dir>): record
+# saves every final response under the cassette directory, keyed by method,
+# URL, query and form body; replay answers from those files without touching
+# the network and raises ReplayMiss for anything not recorded. Secrets are
+# kept out of the files: credential query parameters are dropped from the
+# key, request headers aren't stored, and access tokens in bodies are masked.
+
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TIMEOUT = (3.05, 10)  # seconds: (connect, read)
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5            # seconds; doubles each attempt
+BACKOFF_CAP = 8.0
+POOL_SIZE = 10                # keep-alive connections per host
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+SECRET_PARAMS = frozenset({"appid", "apikey", "api_key", "key", "client_secret", "access_token"})
+SECRET_FIELDS = ("access_token", "refresh_token", "id_token")
+
+_mode = os.getenv("HTTP_MODE", "").lower()
+_cassette_dir = os.getenv("HTTP_CASSETTE_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "http_cassettes"
+)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    """The request's cancel event was set before it completed."""
+
+
+class ReplayMiss(LookupError):
+    """Replay mode found no recorded response for a request."""
+
+
+def session_for(url):
+    """Keep-alive session for the URL's scheme and host, created on first use."""
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount(key, adapter)
+            _sessions[key] = session
+        return session
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────
+
+class EndpointStats:
+    __slots__ = ("calls", "errors", "retries", "total_ms", "max_ms", "last_status")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_status = None
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "max_ms": self.max_ms,
+            "last_status": self.last_status,
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(endpoint, elapsed_ms, status, failed, retried):
+    with _stats_lock:
+        stats = _stats.get(endpoint)
+        if stats is None:
+            stats = _stats[endpoint] = EndpointStats()
+        stats.calls += 1
+        stats.errors += failed
+        stats.retries += retried
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.last_status = status
+
+
+def metrics():
+    """Snapshot of the per-endpoint counters: {endpoint: {calls, errors, retries, avg_ms, max_ms, last_status}}."""
+    with _stats_lock:
+        return {endpoint: stats.as_dict() for endpoint, stats in _stats.items()}
+
+
+def format_metrics():
+    lines = []
+    for endpoint, s in sorted(metrics().items()):
+        lines.append(
+            f"{endpoint}: {s['calls']} calls, {s['errors']} errors, {s['retries']} retries, "
+            f"avg {s['avg_ms']:.0f} ms, max {s['max_ms']:.0f} ms"
+        )
+    return "\n".join(lines)
+
+
+# ── Record / replay ───────────────────────────────────────────────────────
+
+def set_mode(mode, cassette_dir=None):
+    """Switch between live ("" / None), "record" and "replay"; overrides HTTP_MODE for this process."""
+    global _mode, _cassette_dir
+    mode = (mode or "").lower()
+    if mode not in ("", "record", "replay"):
+        raise ValueError(f"Unknown HTTP mode {mode!r}")
+    _mode = mode
+    if cassette_dir:
+        _cassette_dir = cassette_dir
+
+
+def _cassette_path(method, url, kwargs):
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query) + list((kwargs.get("params") or {}).items())
+    query = sorted((k, str(v)) for k, v in query if k.lower() not in SECRET_PARAMS)
+    body = kwargs.get("data") if kwargs.get("data") is not None else kwargs.get("json")
+    if isinstance(body, dict):
+        body = sorted((k, str(v)) for k, v in body.items())
+    key = json.dumps([method, f"{parts.scheme}://{parts.netloc}{parts.path}", query, body], default=str)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    host = parts.netloc.replace(":", "_") or "local"
+    return os.path.join(_cassette_dir, host, digest + ".json"), key
+
+
+def _mask_secrets(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(data, dict) and any(field in data for field in SECRET_FIELDS):
+        for field in SECRET_FIELDS:
+            if field in data:
+                data[field] = "recorded-token"
+        return json.dumps(data)
+    return body
+
+
+def _save_cassette(method, url, kwargs, response):
+    path, key = _cassette_path(method, url, kwargs)
+    content_type = response.headers.get("Content-Type", "")
+    entry = {"request": key, "status": response.status_code, "headers": {"Content-Type": content_type}}
+    if "json" in content_type or content_type.startswith("text/"):
+        entry["body"] = _mask_secrets(response.content.decode(response.encoding or "utf-8", "replace"))
+    else:
+        entry["body_b64"] = base64.b64encode(response.content).decode("ascii")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not record {method} {url}: {e}")
+
+
+def _replay(method, url, kwargs):
+    path, key = _cassette_path(method, url, kwargs)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        raise ReplayMiss(f"No recording for {key}") from None
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+    if "body_b64" in entry:
+        response._content = base64.b64decode(entry["body_b64"])
+    else:
+        response._content = entry.get("body", "").encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+# ── Requests ──────────────────────────────────────────────────────────────
+
+def _backoff(attempt, response=None):
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    if response is not None and response.status_code == 429:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            delay = max(delay, min(BACKOFF_CAP, float(retry_after)))
+    return delay
+
+
+def _sleep(delay, cancel, url):
+    if cancel is None:
+        time.sleep(delay)
+    elif cancel.wait(delay):
+        raise Cancelled(url)
+
+
+def request(method, url, endpoint=None, timeout=DEFAULT_TIMEOUT, retries=None, cancel=None, **kwargs):
+    """
+    Send a request through the host's pooled session and return the Response.
+
+    Retries apply to idempotent methods by default; pass `retries` to override
+    (e.g. a token POST that is safe to repeat). The final 429/5xx response is
+    returned, not raised, so callers keep their own raise_for_status() checks;
+    a connection error on the last attempt is raised.
+    """
+    method = method.upper()
+    if retries is None:
+        retries = MAX_RETRIES if method in IDEMPOTENT_METHODS else 0
+    if endpoint is None:
+        parts = urlsplit(url)
+        endpoint = f"{method} {parts.netloc}{parts.path}"
+
+    if _mode == "replay":
+        if cancel is not None and cancel.is_set():
+            raise Cancelled(url)
+        start = time.perf_counter()
+        response = _replay(method, url, kwargs)
+        _record(endpoint, (time.perf_counter() - start) * 1000, response.status_code,
+                response.status_code >= 400, False)
+        return response
+
+    session = session_for(url)
+    attempt = 0
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise Cancelled(url)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _record(endpoint, elapsed_ms, None, True, attempt > 0)
+            if attempt >= retries:
+                raise
+            _sleep(_backoff(attempt), cancel, url)
+            attempt += 1
+            continue
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        status = response.status_code
+        _record(endpoint, elapsed_ms, status, status >= 400, attempt > 0)
+        if cancel is not None and cancel.is_set():
+            response.close()
+            raise Cancelled(url)
+        if status not in RETRY_STATUSES or attempt >= retries:
+            if _mode == "record":
+                _save_cassette(method, url, kwargs, response)
+            return response
+        delay = _backoff(attempt, response)
+        response.close()
+        _sleep(delay, cancel, url)
+        attempt += 1
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.ext.declarative import declarative_base
+import database
+
+Base = declarative_base()
+
+
+class BarcodeLookupMiss(Base):
+    __tablename__ = 'barcode_lookup_miss'
+
+    barcode = Column(String(255), primary_key=True)
+    source = Column(String(50))
+    checked_at = Column(DateTime)
+
+
+def create_tables():
+    """Create all tables in the database using the engine from database.py."""
+    engine = database.engine
+    Base.metadata.create_all(engine)
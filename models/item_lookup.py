@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String
+from sqlalchemy import Boolean, Column, Integer, BigInteger, Numeric, String
 from sqlalchemy.ext.declarative import declarative_base
 import database
 
@@ -13,6 +13,8 @@ class ItemLookup(Base):
     description = Column(String(500))
     barcode = Column(BigInteger, nullable=True)
     quantity_id = Column(Integer, default=1, nullable=True)
+    min_stock = Column(Numeric(10, 2), nullable=True)
+    need_refill = Column(Boolean, default=False)
 
 
 def create_tables():
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.ext.declarative import declarative_base
+import database
+
+Base = declarative_base()
+
+
+class PantryJournal(Base):
+    __tablename__ = 'pantry_journal'
+
+    journal_id = Column(Integer, primary_key=True)
+    station = Column(String(100))
+    action = Column(String(50))
+    created_at = Column(DateTime)
+    before_image = Column(Text)
+    after_image = Column(Text)
+
+
+def create_tables():
+    """Create all tables in the database using the engine from database.py."""
+    engine = database.engine
+    Base.metadata.create_all(engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Integer, Numeric, String
 from sqlalchemy.ext.declarative import declarative_base
 import database
 
@@ -11,6 +11,7 @@ class StorageCategory(Base):
     storage_categories_id = Column(Integer, primary_key=True)
     storage_category_name = Column(String(100))
     quantity_id = Column(Integer)
+    min_stock = Column(Numeric(10, 2), nullable=True)
     need_refill = Column(Boolean, default=False)
 
 
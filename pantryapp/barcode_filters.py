@@ -0,0 +1,166 @@
+"""barcode_filters.py
+
+Cheap pre-checks that decide whether an unknown barcode is worth a network
+lookup (see resolve_unknown_barcode in pantry_model):
+
+  - a persisted Bloom filter of every barcode in the offline OpenFoodFacts
+    catalog. "Not in the filter" is definite, so most misses never touch
+    SQLite or the mmap'd index; a hit is confirmed with a real lookup.
+  - is_restricted_barcode(): store-internal / variable-weight / produce codes
+    that no public database will ever know.
+
+The filter file is built from the slim DB:
+    python -m pantryapp.barcode_filters
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from typing import Iterable, Optional
+
+from database import DB_NAME
+from .barcode_index import INDEX_PATH, barcode_key
+
+MAGIC = b"BLM1"
+_HEADER = struct.Struct("<4sIQQ")  # magic, hash count, bit count, item count
+FALSE_POSITIVE_RATE = 0.01
+
+CATALOG_FILTER_PATH = os.path.join(
+    os.path.dirname(INDEX_PATH), os.path.splitext(DB_NAME)[0] + ".barcodes.bloom"
+)
+
+
+def _positions(key: int, hashes: int, bits: int):
+    # Kirsch-Mitzenmacher double hashing: two 64-bit halves of one digest give every probe.
+    digest = hashlib.blake2b(key.to_bytes(8, "little"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class BloomFilter:
+    """Bloom filter over integer barcode keys; `bits` may be a bytearray or a read-only mmap."""
+
+    def __init__(self, bit_count: int, hash_count: int, bits=None, count: int = 0):
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((bit_count + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = FALSE_POSITIVE_RATE) -> "BloomFilter":
+        capacity = max(1, capacity)
+        bit_count = max(8, math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        hash_count = max(1, round(bit_count / capacity * math.log(2)))
+        return cls(bit_count, hash_count)
+
+    def add(self, barcode) -> None:
+        key = barcode_key(barcode)
+        if key is None:
+            return
+        for pos in _positions(key, self.hash_count, self.bit_count):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, barcode) -> bool:
+        key = barcode_key(barcode)
+        if key is None:
+            return False
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in _positions(key, self.hash_count, self.bit_count))
+
+    def save(self, path: str) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, self.hash_count, self.bit_count, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, hash_count, bit_count, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or len(data) < _HEADER.size + (bit_count + 7) // 8:
+            data.close()
+            raise ValueError(f"{path} is not a barcode filter")
+        # Slicing the mmap would copy it; offset reads through a memoryview keep it paged.
+        bits = memoryview(data)[_HEADER.size:]
+        return cls(bit_count, hash_count, bits=bits, count=count)
+
+
+_catalog_filter = None
+_catalog_filter_checked = False
+_catalog_filter_lock = threading.Lock()
+
+
+def get_catalog_filter() -> Optional[BloomFilter]:
+    """Shared catalog filter, loaded on first use; None when it hasn't been built."""
+    global _catalog_filter, _catalog_filter_checked
+    with _catalog_filter_lock:
+        if not _catalog_filter_checked:
+            _catalog_filter_checked = True
+            try:
+                _catalog_filter = BloomFilter.load(CATALOG_FILTER_PATH)
+            except FileNotFoundError:
+                _catalog_filter = None
+            except (OSError, ValueError) as e:
+                print(f"Catalog barcode filter unavailable: {e}")
+                _catalog_filter = None
+        return _catalog_filter
+
+
+def is_restricted_barcode(barcode) -> bool:
+    """
+    True for codes no public product database can resolve: produce PLUs (4-5
+    digits) and other short codes, and GS1 restricted-circulation numbers
+    (in-store / variable-weight labels: UPC-A starting 2 or 4, EAN-13 starting
+    02, 04 or 2x). 6-7 digit UPC-E codes (no number system and/or check digit)
+    are real products and pass.
+    """
+    raw = str(barcode or "").strip()
+    if not raw.isdigit() or len(raw) < 6:
+        return True
+    if len(raw) == 12:
+        return raw[0] in "24"
+    if len(raw) == 13:
+        return raw[:2] in ("02", "04") or raw[0] == "2"
+    return False
+
+
+# --- Builder ---
+
+def build_catalog_filter(codes: Iterable, capacity: int, out_path: str = CATALOG_FILTER_PATH) -> int:
+    bloom = BloomFilter.for_capacity(capacity)
+    for code in codes:
+        bloom.add(code)
+    bloom.save(out_path)
+    return bloom.count
+
+
+def main(argv=None):
+    default_db = os.path.join(os.path.dirname(INDEX_PATH), DB_NAME)
+    parser = argparse.ArgumentParser(description="Build the catalog barcode Bloom filter from the slim DB.")
+    parser.add_argument("--db", default=default_db, help=f"OpenFoodFacts slim DB (default {default_db})")
+    parser.add_argument("--out", default=CATALOG_FILTER_PATH, help=f"filter file to write (default {CATALOG_FILTER_PATH})")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        capacity = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        codes = (row[0] for row in conn.execute("SELECT code FROM products"))
+        count = build_catalog_filter(codes, capacity, args.out)
+    finally:
+        conn.close()
+    print(f"Wrote filter for {count} barcodes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
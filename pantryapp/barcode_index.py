@@ -0,0 +1,235 @@
+"""barcode_index.py
+
+Prebuilt, memory-mapped barcode index over the OpenFoodFacts slim DB.
+
+Probing the multi-million-row `products` table through SQLite costs a B-tree
+walk plus Python row overhead per barcode. This file is built once from that
+table and then only mmap'd: nothing is parsed at startup and pages are faulted
+in by the OS as the binary search touches them, so resident memory stays tiny.
+
+File layout (little-endian):
+
+    header   magic b"BCX1", uint32 flags (0), uint64 count
+    keys     count x uint64     GTIN as an integer, sorted ascending
+    offsets  (count+1) x uint32 start of each record in the string table
+    strings  UTF-8 records "name \\x1f brand \\x1f quantity"
+
+Barcodes are stored as integers, so "012345" and "12345" are the same key
+(the leading-zero retry that _lookup_display_name does in SQL is free here).
+
+Build (or rebuild after refreshing the slim DB):
+    python -m pantryapp.barcode_index
+
+The same command also adds NAME_INDEX (products.name COLLATE NOCASE) to the
+slim DB for Add Product autocomplete. The app only checks for it at runtime
+and never writes to the slim DB itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Optional, Tuple
+
+from database import DB_NAME
+
+MAGIC = b"BCX1"
+_HEADER = struct.Struct("<4sIQ")
+_FIELD_SEP = "\x1f"
+_MAX_GTIN = (1 << 64) - 1
+
+NAME_INDEX = "products_name_nocase_idx"
+
+INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    os.path.splitext(DB_NAME)[0] + ".barcodes.idx",
+)
+
+CatalogEntry = Tuple[str, Optional[str], Optional[str]]  # (name, brand, quantity)
+
+
+def barcode_key(barcode) -> Optional[int]:
+    """Integer key for a barcode, or None if it isn't a plain GTIN/UPC/EAN."""
+    raw = str(barcode or "").strip()
+    if not raw.isdigit():
+        return None
+    key = int(raw)
+    return key if 0 < key <= _MAX_GTIN else None
+
+
+class _UnpackedView:
+    """Sequence over packed little-endian integers, for big-endian hosts where memoryview.cast won't do."""
+
+    def __init__(self, buf, start, count, fmt):
+        self._buf, self._start, self._count = buf, start, count
+        self._struct = struct.Struct("<" + fmt)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return self._struct.unpack_from(self._buf, self._start + i * self._struct.size)[0]
+
+
+class BarcodeIndex:
+    """Read-only view of an index file; lookups are a binary search over the mmap'd key array."""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+
+        magic, _flags, count = _HEADER.unpack_from(self._map, 0)
+        keys_at = _HEADER.size
+        offsets_at = keys_at + 8 * count
+        self._strings_at = offsets_at + 4 * (count + 1)
+        if magic != MAGIC or len(self._map) < self._strings_at:
+            self.close()
+            raise ValueError(f"{path} is not a barcode index")
+
+        self._count = count
+        if sys.byteorder == "little":
+            self._view = memoryview(self._map)
+            self._keys = self._view[keys_at:offsets_at].cast("Q")
+            self._offsets = self._view[offsets_at:self._strings_at].cast("I")
+        else:
+            self._view = None
+            self._keys = _UnpackedView(self._map, keys_at, count, "Q")
+            self._offsets = _UnpackedView(self._map, offsets_at, count + 1, "I")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _position(self, barcode) -> Optional[int]:
+        key = barcode_key(barcode)
+        if key is None:
+            return None
+        i = bisect_left(self._keys, key)
+        if i < self._count and self._keys[i] == key:
+            return i
+        return None
+
+    def __contains__(self, barcode) -> bool:
+        return self._position(barcode) is not None
+
+    def get(self, barcode) -> Optional[CatalogEntry]:
+        i = self._position(barcode)
+        if i is None:
+            return None
+        start = self._strings_at + self._offsets[i]
+        end = self._strings_at + self._offsets[i + 1]
+        name, brand, quantity = self._map[start:end].decode("utf-8").split(_FIELD_SEP)
+        return name, brand or None, quantity or None
+
+    def close(self) -> None:
+        # Views must be released before the mmap can close.
+        for view in ("_keys", "_offsets", "_view"):
+            obj = getattr(self, view, None)
+            if isinstance(obj, memoryview):
+                obj.release()
+        self._map.close()
+        self._file.close()
+
+
+_index = None
+_index_checked = False
+_index_lock = threading.Lock()
+
+
+def get_barcode_index() -> Optional[BarcodeIndex]:
+    """Shared index, opened on first use; None when the file hasn't been built."""
+    global _index, _index_checked
+    with _index_lock:
+        if not _index_checked:
+            _index_checked = True
+            try:
+                _index = BarcodeIndex(INDEX_PATH)
+            except FileNotFoundError:
+                _index = None
+            except (OSError, ValueError) as e:
+                print(f"Barcode index unavailable: {e}")
+                _index = None
+        return _index
+
+
+# --- Builder ---
+
+def _clean(value) -> str:
+    return str(value).replace(_FIELD_SEP, " ").strip() if value is not None else ""
+
+
+def build_index(db_path: str, out_path: str = INDEX_PATH) -> int:
+    """Build the index file from the products table; returns the number of barcodes written."""
+    conn = sqlite3.connect(db_path)
+    try:
+        entries = {}
+        for code, name, brand, quantity in conn.execute("SELECT code, name, brand, quantity FROM products"):
+            key = barcode_key(code)
+            if key is None or key in entries:
+                continue
+            entries[key] = f"{_clean(name)}{_FIELD_SEP}{_clean(brand)}{_FIELD_SEP}{_clean(quantity)}"
+    finally:
+        conn.close()
+
+    keys = array("Q", sorted(entries))
+    offsets = array("I")
+    strings = bytearray()
+    for key in keys:
+        offsets.append(len(strings))
+        strings += entries[key].encode("utf-8")
+    offsets.append(len(strings))
+    if len(strings) > 0xFFFFFFFF:
+        raise ValueError("String table exceeds 4 GiB; uint32 offsets can't address it")
+    if sys.byteorder != "little":
+        keys.byteswap()
+        offsets.byteswap()
+
+    # Write beside the target and swap in, so a running app never maps a half-written file.
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, 0, len(keys)))
+        f.write(keys.tobytes())
+        f.write(offsets.tobytes())
+        f.write(strings)
+    os.replace(tmp_path, out_path)
+    return len(keys)
+
+
+def build_name_index(db_path: str) -> None:
+    """Add the NOCASE name index autocomplete range-scans on (no-op if it already exists)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {NAME_INDEX} ON products (name COLLATE NOCASE)")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    default_db = os.path.join(os.path.dirname(INDEX_PATH), DB_NAME)
+    parser = argparse.ArgumentParser(description="Build the memory-mapped barcode index (and name index) from the slim DB.")
+    parser.add_argument("--db", default=default_db, help=f"OpenFoodFacts slim DB (default {default_db})")
+    parser.add_argument("--out", default=INDEX_PATH, help=f"index file to write (default {INDEX_PATH})")
+    parser.add_argument("--skip-name-index", action="store_true",
+                        help=f"don't add {NAME_INDEX} to the slim DB")
+    args = parser.parse_args(argv)
+
+    count = build_index(args.db, args.out)
+    print(f"Wrote {count} barcodes to {args.out}")
+    if not args.skip_name_index:
+        build_name_index(args.db)
+        print(f"Ensured {NAME_INDEX} on {args.db}")
+
+
+if __name__ == "__main__":
+    main()
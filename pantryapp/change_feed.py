@@ -0,0 +1,179 @@
+"""change_feed.py
+
+Cross-device pantry change notifications.
+
+Postgres: triggers on item / item_lookup / storage_categories call pg_notify
+(see the latest sqlscripts/createtables_*.sql). A background thread LISTENs on
+the channel and blocks in select(), so an idle kiosk sends no queries at all.
+
+SQLite (only when the pantry engine itself is SQLite): the same tables get
+triggers that append to a change_log table, which is polled by sequence
+number. A Postgres pantry whose server is unreachable is retried every
+RECONNECT_SECONDS; the feed never falls back to the OpenFoodFacts catalog file.
+
+Subscribers receive lists of (table, op, row_id) tuples on the feed thread.
+A ("*", "RESYNC", None) entry means changes may have been missed (e.g. after a
+reconnect) and the subscriber should reload everything once.
+"""
+
+from __future__ import annotations
+
+import json
+import select
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from database import engine, get_postgres_connection
+
+CHANNEL = "pantry_changes"
+SQLITE_POLL_SECONDS = 2.0
+RECONNECT_SECONDS = 5.0
+
+Change = Tuple[str, str, Optional[int]]
+
+RESYNC: Change = ("*", "RESYNC", None)
+
+# table name -> primary key column
+WATCHED_TABLES = {
+    "item": "item_id",
+    "item_lookup": "item_lookup_id",
+    "storage_categories": "storage_categories_id",
+}
+
+
+def _parse_payload(payload: str) -> Optional[Change]:
+    try:
+        data = json.loads(payload)
+        row_id = data.get("id")
+        return (data["table"], data["op"], int(row_id) if row_id is not None else None)
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _connect():
+    """Connection to the pantry database itself, or None if it is unreachable."""
+    if engine.dialect.name == "sqlite":
+        try:
+            return sqlite3.connect(engine.url.database)
+        except sqlite3.Error as e:
+            print(f"Change feed could not open {engine.url.database}: {e}")
+            return None
+    return get_postgres_connection()
+
+
+def _ensure_sqlite_change_log(conn) -> None:
+    """Create the change_log table and triggers on a SQLite pantry DB if the pantry tables exist there."""
+    existing = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    }
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            row_id INTEGER
+        )
+        """
+    )
+    # Keep the log bounded; a kiosk further behind than this just resyncs.
+    conn.execute("DELETE FROM change_log WHERE seq <= (SELECT MAX(seq) - 10000 FROM change_log)")
+    for table, pk in WATCHED_TABLES.items():
+        if table not in existing:
+            continue
+        for op, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_{op.lower()}_change_log
+                AFTER {op} ON {table}
+                BEGIN
+                    INSERT INTO change_log (table_name, op, row_id) VALUES ('{table}', '{op}', {ref}.{pk});
+                END
+                """
+            )
+    conn.commit()
+
+
+class ChangeFeed:
+    """Background listener that forwards pantry row changes to a callback."""
+
+    def __init__(self, on_changes: Callable[[List[Change]], None]):
+        self.on_changes = on_changes
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        first_connect = True
+        while not self._stop.is_set():
+            conn = _connect()
+            if conn is None:
+                # The UI loaded (or failed to) without us; catch up once we're back.
+                first_connect = False
+                self._stop.wait(RECONNECT_SECONDS)
+                continue
+
+            # Anything may have changed while we were disconnected.
+            if not first_connect:
+                self.on_changes([RESYNC])
+            first_connect = False
+
+            try:
+                if isinstance(conn, sqlite3.Connection):
+                    self._poll_sqlite(conn)
+                else:
+                    self._listen_postgres(conn)
+            except Exception as e:
+                print(f"Change feed error: {e}")
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+            self._stop.wait(RECONNECT_SECONDS)
+
+    def _listen_postgres(self, conn) -> None:
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL};")
+
+        while not self._stop.is_set():
+            # select() only waits on the socket; the timeout just lets us notice stop().
+            if select.select([conn], [], [], 1.0) == ([], [], []):
+                continue
+            conn.poll()
+            changes = []
+            while conn.notifies:
+                change = _parse_payload(conn.notifies.pop(0).payload)
+                if change is not None:
+                    changes.append(change)
+            if changes:
+                self.on_changes(changes)
+
+    def _poll_sqlite(self, conn) -> None:
+        _ensure_sqlite_change_log(conn)
+        last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+
+        while not self._stop.wait(SQLITE_POLL_SECONDS):
+            rows = conn.execute(
+                "SELECT seq, table_name, op, row_id FROM change_log WHERE seq > ? ORDER BY seq",
+                (last_seq,),
+            ).fetchall()
+            if not rows:
+                continue
+            last_seq = rows[-1][0]
+            self.on_changes([(table, op, row_id) for _seq, table, op, row_id in rows])
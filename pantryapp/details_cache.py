@@ -0,0 +1,115 @@
+"""details_cache.py
+
+Background prefetch + LRU cache for ItemDetailsWindow payloads.
+
+The pantry page asks for details of the row under the mouse / keyboard focus
+ahead of time; a single worker thread loads them (DB work only, no Tk calls)
+and hands the result back to the Tk thread with `after(0, ...)`. The window
+then opens straight from the cache and asks for a fresh copy, which it
+applies in place only if something changed. The pantry page evicts entries
+for rows the change feed reports, so remote edits are never served stale.
+
+Explicit requests (an open window waiting on data) are served before
+prefetches, and only the most recent few prefetches are kept so sweeping the
+mouse over a long list doesn't queue a query per row.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable
+
+from .pantry_model import session
+
+DETAILS_CACHE_SIZE = 32
+MAX_PREFETCHES = 4
+
+MISSING = object()
+
+
+class DetailsCache:
+    """LRU of loaded detail payloads keyed by barcode. Public methods are for the Tk thread."""
+
+    def __init__(self, widget, load: Callable[[str], Any], size: int = DETAILS_CACHE_SIZE):
+        self.widget = widget
+        self.load = load
+        self.size = size
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._waiters: dict[str, list] = {}
+
+        self._cond = threading.Condition()
+        self._requests: deque = deque()
+        self._prefetches: deque = deque(maxlen=MAX_PREFETCHES)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def get(self, barcode: str):
+        """Cached payload for barcode, or MISSING."""
+        if barcode not in self._entries:
+            return MISSING
+        self._entries.move_to_end(barcode)
+        return self._entries[barcode]
+
+    def prefetch(self, barcode: str) -> None:
+        if not barcode or barcode in self._entries:
+            return
+        with self._cond:
+            if barcode not in self._prefetches:
+                self._prefetches.append(barcode)
+                self._cond.notify()
+
+    def request(self, barcode: str, callback: Callable[[str, Any], None]) -> None:
+        """Load a fresh payload (even if cached) and call callback(barcode, payload) on the Tk thread."""
+        self._waiters.setdefault(barcode, []).append(callback)
+        with self._cond:
+            self._requests.append(barcode)
+            self._cond.notify()
+
+    def invalidate(self, barcode: str) -> None:
+        self._entries.pop(barcode, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _store(self, barcode: str, payload) -> None:
+        self._entries[barcode] = payload
+        self._entries.move_to_end(barcode)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def _deliver(self, barcode: str, payload) -> None:
+        # Failures aren't cached; waiting windows get the exception to report.
+        if not isinstance(payload, Exception):
+            self._store(barcode, payload)
+        for callback in self._waiters.pop(barcode, []):
+            callback(barcode, payload)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not (self._stopped or self._requests or self._prefetches):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                # Open windows first; newest prefetch (what the user is pointing at now) next.
+                barcode = self._requests.popleft() if self._requests else self._prefetches.pop()
+
+            try:
+                payload = self.load(barcode)
+            except Exception as e:
+                print(f"Could not load details for {barcode}: {e}")
+                session.rollback()
+                payload = e
+
+            try:
+                self.widget.after(0, self._deliver, barcode, payload)
+            except Exception:
+                # Widget destroyed; nothing left to deliver to.
+                return
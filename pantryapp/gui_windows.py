@@ -1,6 +1,8 @@
 # gui_windows.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from tkinter import ttk, messagebox, simpledialog
 # Import only available model functions
 from .pantry_model import (
     delete_item,
@@ -9,7 +11,18 @@ from .pantry_model import (
     create_storage_category,
     delete_storage_category,
     add_manual_lookup_and_item,
+    search_product_suggestions,
+    set_item_min_stock,
+    set_category_min_stock,
+    plan_stocktake,
+    apply_stocktake,
 )
+from .scanner_input import get_scanner_input
+from .pantry_snapshot import AGE_FILTERS
+from .details_cache import MISSING
+
+# One worker serves every autocomplete query; superseded keystrokes are skipped when dequeued.
+_suggestion_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="suggestions")
 
 # --- Toplevel Window Helper Classes ---
 
@@ -68,99 +81,165 @@ def _build_scrollable_body(parent, bg_color):
     return content
 
 
+def _as_text(value, default=""):
+    if value is None:
+        return default
+    text = str(value).strip()
+    return text if text else default
+
+
+def load_item_details(barcode):
+    """
+    Query and format everything ItemDetailsWindow shows for a barcode.
+    No Tk calls, so it can run on the details prefetch worker.
+    """
+    product = get_product_details(barcode)
+
+    # Determine if metadata was found
+    has_info = product is not None
+
+    # Use fallback values if no product information is found
+    name = _as_text((product.get("name") if has_info else None), "Unknown product")
+    brand = _as_text((product.get("brand") if has_info else None), "")
+    categories_str = _as_text((product.get("categories") if has_info else None), "")
+
+    # Format category string
+    category_list = [c.strip() for c in categories_str.split(",") if c.strip()]
+    if len(category_list) > 4:
+        category_display = ", ".join(category_list[:4]) + "..."
+    else:
+        category_display = ", ".join(category_list) if category_list else "N/A"
+
+    # Helper for nutrition formatting
+    def fmt_val(key):
+        if not has_info:
+            return "N/A"
+        val = product.get(key)
+        if val is None:
+            return "N/A"
+        if isinstance(val, str):
+            val = val.strip()
+            if not val:
+                return "N/A"
+        try:
+            return f"{float(val):g}"
+        except (TypeError, ValueError):
+            return str(val)
+
+    return {
+        "has_info": has_info,
+        "title": name if not brand else f"{brand} - {name}",
+        "quantity": _as_text((product.get("quantity") if has_info else None), "N/A"),
+        "categories": category_display,
+        "description": _as_text((product.get("description") if has_info else None), "N/A"),
+        "min_stock": product.get("min_stock") if has_info else None,
+        "nutrition": [
+            ("Energy", fmt_val("energy_kcal_100g"), "kcal"),
+            ("Fat", fmt_val("fat_100g"), "g"),
+            ("Saturated fat", fmt_val("saturated_fat_100g"), "g"),
+            ("Carbohydrates", fmt_val("carbs_100g"), "g"),
+            ("Sugars", fmt_val("sugars_100g"), "g"),
+            ("Proteins", fmt_val("proteins_100g"), "g"),
+            ("Salt", fmt_val("salt_100g"), "g"),
+        ],
+    }
+
+
 class ItemDetailsWindow(tk.Toplevel):
-    def __init__(self, master, barcode, refresh_callback, style_config):
+    def __init__(self, master, barcode, refresh_callback, style_config, details_cache=None):
         super().__init__(master)
         self.master = master
         self.barcode = barcode
         self.refresh_callback = refresh_callback
         self.style_config = style_config
-        
+        self.details_cache = details_cache
+        self.details = None
+
         self.configure(bg=self.style_config["bg_main"])
         self.title("Product Details")
         self.geometry("400x560")
         self.transient(master)
         self.grab_set()
 
-        try:
-            self._load_and_create_widgets()
-            _center_window(self)
-        except Exception as e:
-            messagebox.showerror(
-                "Product details error",
-                f"Could not display product details for barcode {self.barcode}.\n\n{e}",
-            )
-            self.destroy()
+        self._create_actions()
+        self.body_host = ttk.Frame(self)
+        self.body_host.pack(fill=tk.BOTH, expand=True)
 
-    def _load_and_create_widgets(self):
-        # Attempt to fetch details from the master database
-        product = get_product_details(self.barcode) 
-        
-        # Determine if metadata was found
-        has_info = product is not None
-        
-        # Use fallback values if no product information is found
-        name = self._as_text((product.get("name") if has_info else None), "Unknown product")
-        brand = self._as_text((product.get("brand") if has_info else None), "")
-        quantity = self._as_text((product.get("quantity") if has_info else None), "N/A")
-        categories_str = self._as_text((product.get("categories") if has_info else None), "")
-        description = self._as_text((product.get("description") if has_info else None), "N/A")
-
-        # Format category string
-        category_list = [c.strip() for c in categories_str.split(",") if c.strip()]
-        if len(category_list) > 4:
-            category_display = ", ".join(category_list[:4]) + "..."
+        if details_cache is None:
+            try:
+                self._show_details(load_item_details(self.barcode))
+                _center_window(self)
+            except Exception as e:
+                self._show_load_error(e)
+            return
+
+        # Open straight from the prefetch cache, then refresh in place if the DB disagrees.
+        cached = details_cache.get(self.barcode)
+        if cached is MISSING:
+            ttk.Label(self.body_host, text="Loading...", background=self.style_config["bg_main"],
+                      foreground=self.style_config["text_muted"]).pack(padx=20, pady=20)
         else:
-            category_display = ", ".join(category_list) if category_list else "N/A"
+            self._show_details(cached)
+        _center_window(self)
+        details_cache.request(self.barcode, self._on_details_loaded)
 
-        # Helper for nutrition formatting
-        def fmt_val(key):
-            if not has_info:
-                return "N/A"
-            val = product.get(key)
-            if val is None:
-                return "N/A"
-            if isinstance(val, str):
-                val = val.strip()
-                if not val:
-                    return "N/A"
-            try:
-                return f"{float(val):g}"
-            except (TypeError, ValueError):
-                return str(val)
+    def _on_details_loaded(self, _barcode, details):
+        if not self.winfo_exists():
+            return
+        if isinstance(details, Exception):
+            if self.details is None:
+                self._show_load_error(details)
+            return
+        if details != self.details:
+            self._show_details(details)
 
-        nutrition_data = [
-            ("Energy", fmt_val("energy_kcal_100g"), "kcal"),
-            ("Fat", fmt_val("fat_100g"), "g"),
-            ("Saturated fat", fmt_val("saturated_fat_100g"), "g"),
-            ("Carbohydrates", fmt_val("carbs_100g"), "g"),
-            ("Sugars", fmt_val("sugars_100g"), "g"),
-            ("Proteins", fmt_val("proteins_100g"), "g"),
-            ("Salt", fmt_val("salt_100g"), "g"),
-        ]
+    def _show_load_error(self, error):
+        messagebox.showerror(
+            "Product details error",
+            f"Could not display product details for barcode {self.barcode}.\n\n{error}",
+        )
+        self.destroy()
 
-        # UI creation
+    def _create_actions(self):
         actions = ttk.Frame(self, padding=(20, 10, 20, 20))
         actions.pack(side=tk.BOTTOM, fill=tk.X)
 
-        frame = _build_scrollable_body(self, self.style_config["bg_main"])
+        # Keep actions at the bottom so they remain visible even with long content.
+        ttk.Button(
+            actions,
+            text="Delete from pantry",
+            style="Danger.TButton",
+            command=self._on_delete,
+        ).pack(anchor="center", pady=(0, 6))
+
+        ttk.Button(actions, text="Close", command=self.destroy).pack(anchor="center")
+
+    def _show_details(self, details):
+        """(Re)build the scrollable body from a load_item_details() payload."""
+        for child in self.body_host.winfo_children():
+            child.destroy()
+        self.details = details
+
+        frame = _build_scrollable_body(self.body_host, self.style_config["bg_main"])
         frame.configure(padding=(20, 20, 20, 8))
 
-        title = name if not brand else f"{brand} - {name}"
-        ttk.Label(frame, text=title, style="DetailTitle.TLabel",
+        ttk.Label(frame, text=details["title"], style="DetailTitle.TLabel",
                   wraplength=380, justify="left").pack(anchor="w")
 
         # Display a status message if info is missing
-        if not has_info:
+        if not details["has_info"]:
             ttk.Label(frame, text=f"Barcode: {self.barcode}", 
                       background=self.style_config["bg_main"], foreground="gray").pack(anchor="w")
             ttk.Label(frame, text="(Detailed info not found in database)", 
                       background=self.style_config["bg_main"], foreground="#ff6b6b", 
                       font=("Segoe UI", 10, "italic")).pack(anchor="w", pady=(0, 10))
 
-        self._create_info_section(frame, "Package / serving size:", quantity)
-        self._create_info_section(frame, "Categories:", category_display, pady_top=8, wraplength=380)
-        self._create_info_section(frame, "Description:", description, pady_top=8, wraplength=380)
+        self._create_info_section(frame, "Package / serving size:", details["quantity"])
+        self._create_info_section(frame, "Categories:", details["categories"], pady_top=8, wraplength=380)
+        self._create_info_section(frame, "Description:", details["description"], pady_top=8, wraplength=380)
+
+        if details["has_info"]:
+            self._create_min_stock_section(frame, details["min_stock"])
 
         ttk.Label(frame, text="Nutrition (per 100 g):",
                   style="DetailSection.TLabel").pack(anchor="w", pady=(12, 4))
@@ -168,19 +247,9 @@ class ItemDetailsWindow(tk.Toplevel):
         info_frame = ttk.Frame(frame)
         info_frame.pack(anchor="w", fill=tk.X)
 
-        for label, value, unit in nutrition_data:
+        for label, value, unit in details["nutrition"]:
             self._create_nutrition_row(info_frame, label, value, unit)
 
-        # Keep actions at the bottom so they remain visible even with long content.
-        ttk.Button(
-            actions,
-            text="Delete from pantry",
-            style="Danger.TButton",
-            command=self._on_delete,
-        ).pack(anchor="center", pady=(0, 6))
-
-        ttk.Button(actions, text="Close", command=self.destroy).pack(anchor="center")
-
     def _create_info_section(self, parent, title, value, pady_top=0, wraplength=None):
         ttk.Label(parent, text=title, style="DetailSection.TLabel").pack(anchor="w", pady=(pady_top, 0))
         label = ttk.Label(parent, text=str(value), background=self.style_config["bg_main"], foreground=self.style_config["text_main"])
@@ -188,6 +257,30 @@ class ItemDetailsWindow(tk.Toplevel):
             label.config(wraplength=wraplength, justify="left")
         label.pack(anchor="w")
 
+    def _create_min_stock_section(self, parent, min_stock):
+        ttk.Label(parent, text="Minimum stock (blank = no alert):",
+                  style="DetailSection.TLabel").pack(anchor="w", pady=(8, 0))
+        row_frame = ttk.Frame(parent)
+        row_frame.pack(anchor="w", fill=tk.X, pady=2)
+
+        self.min_stock_var = tk.StringVar(value="" if min_stock is None else f"{float(min_stock):g}")
+        ttk.Entry(row_frame, textvariable=self.min_stock_var, width=8).pack(side=tk.LEFT)
+        ttk.Button(row_frame, text="Save", command=self._on_save_min_stock).pack(side=tk.LEFT, padx=(8, 0))
+
+    def _on_save_min_stock(self):
+        raw = self.min_stock_var.get().strip()
+        if raw:
+            try:
+                if float(raw) < 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showwarning("Invalid value", "Minimum stock must be a positive number or blank.", parent=self)
+                return
+        set_item_min_stock(self.barcode, raw or None)
+        if self.details_cache is not None:
+            self.details_cache.invalidate(self.barcode)
+        self.refresh_callback()
+
     def _create_nutrition_row(self, parent, label, value, unit=""):
         row_frame = ttk.Frame(parent)
         row_frame.pack(fill=tk.X, pady=2)
@@ -197,26 +290,23 @@ class ItemDetailsWindow(tk.Toplevel):
         ttk.Label(row_frame, text=text, background=self.style_config["bg_main"],
                   foreground=self.style_config["text_main"]).pack(side=tk.RIGHT)
 
-    def _as_text(self, value, default=""):
-        if value is None:
-            return default
-        text = str(value).strip()
-        return text if text else default
-
     def _on_delete(self):
         if messagebox.askokcancel(
             "Delete item",
             "Remove this food from your pantry list?"
         ):
             delete_item(self.barcode) # Deletes from local pantry table
+            if self.details_cache is not None:
+                self.details_cache.invalidate(self.barcode)
             self.refresh_callback()
             self.destroy()
 
 
 class UnknownBarcodeDialog(tk.Toplevel):
-    def __init__(self, master, barcode, style_config):
+    def __init__(self, master, barcode, style_config, catalog_name=None):
         super().__init__(master)
         self.barcode = barcode
+        self.catalog_name = catalog_name
         self.style_config = style_config
         self.result = False
 
@@ -241,9 +331,12 @@ class UnknownBarcodeDialog(tk.Toplevel):
             style="DetailTitle.TLabel",
         ).pack(anchor="w", pady=(0, 8))
 
+        message = f"No product was found for barcode {self.barcode}."
+        if self.catalog_name:
+            message = f"Barcode {self.barcode} is not in your products yet.\nThe catalog lists it as: {self.catalog_name}"
         ttk.Label(
             frame,
-            text=f"No product was found for barcode {self.barcode}.\nWould you like to add it?",
+            text=f"{message}\nWould you like to add it?",
             background=self.style_config["bg_main"],
             foreground=self.style_config["text_main"],
             justify="left",
@@ -266,12 +359,19 @@ class UnknownBarcodeDialog(tk.Toplevel):
 
 
 class AddItemWindow(tk.Toplevel):
-    def __init__(self, master, barcode, refresh_callback, style_config):
+    SUGGEST_DELAY_MS = 200
+
+    def __init__(self, master, barcode, refresh_callback, style_config, prefill=None):
         super().__init__(master)
         self.barcode = barcode
         self.refresh_callback = refresh_callback
         self.style_config = style_config
+        self.prefill = prefill or {}
         self.fields = {}
+        # Autocomplete: only the query for the latest keystroke (generation) is rendered.
+        self._suggest_job = None
+        self._suggest_generation = 0
+        self._suggestions = []
 
         self.title("Add Product")
         self.geometry("520x600")
@@ -333,8 +433,108 @@ class AddItemWindow(tk.Toplevel):
         ttk.Button(actions, text="Cancel", command=self.destroy).pack(side=tk.RIGHT)
         ttk.Button(actions, text="Add to pantry", command=self._on_save).pack(side=tk.RIGHT, padx=(0, 8))
 
+        self._create_suggestion_list()
         self.fields["name"].focus_set()
 
+    # --- Name autocomplete ---
+
+    def _create_suggestion_list(self):
+        name_entry = self.fields["name"]
+        self.suggestion_list = tk.Listbox(self, height=6, activestyle="dotbox", exportselection=False)
+        self.suggestion_list.bind("<ButtonRelease-1>", lambda e: self._choose_suggestion())
+        self.suggestion_list.bind("<Return>", lambda e: self._choose_suggestion())
+        self.suggestion_list.bind("<Escape>", lambda e: self._hide_suggestions(focus_name=True))
+
+        name_entry.bind("<KeyRelease>", self._on_name_key, add="+")
+        name_entry.bind("<Down>", self._focus_suggestions, add="+")
+        name_entry.bind("<Escape>", lambda e: self._hide_suggestions(), add="+")
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
+    def _on_name_key(self, event):
+        if event.keysym in ("Down", "Up", "Escape", "Return", "Tab"):
+            return
+        # Debounce: restart the timer on each keystroke; bumping the generation drops in-flight results.
+        self._suggest_generation += 1
+        if self._suggest_job is not None:
+            self.after_cancel(self._suggest_job)
+        self._suggest_job = self.after(self.SUGGEST_DELAY_MS, self._start_suggest, self._suggest_generation)
+
+    def _start_suggest(self, generation):
+        self._suggest_job = None
+        prefix = self.fields["name"].get()
+        _suggestion_worker.submit(self._fetch_suggestions, generation, prefix)
+
+    def _fetch_suggestions(self, generation, prefix):
+        if generation != self._suggest_generation:
+            return
+        try:
+            results = search_product_suggestions(prefix)
+        except Exception as e:
+            print(f"Suggestion lookup failed: {e}")
+            results = []
+        try:
+            self.after(0, self._show_suggestions, generation, results)
+        except Exception:
+            # Window closed while the query ran.
+            pass
+
+    def _show_suggestions(self, generation, results):
+        if generation != self._suggest_generation or not self.winfo_exists():
+            return
+        self._suggestions = results
+        self.suggestion_list.delete(0, tk.END)
+        if not results:
+            self._hide_suggestions()
+            return
+        for suggestion in results:
+            label = suggestion["name"]
+            if suggestion.get("brand"):
+                label = f"{suggestion['brand']} - {label}"
+            if suggestion.get("quantity"):
+                label += f" ({suggestion['quantity']})"
+            self.suggestion_list.insert(tk.END, label)
+        self.suggestion_list.configure(height=min(6, len(results)))
+        self.suggestion_list.place(in_=self.fields["name"], relx=0, rely=1, relwidth=1)
+        self.suggestion_list.lift()
+
+    def _hide_suggestions(self, focus_name=False):
+        self.suggestion_list.place_forget()
+        if focus_name:
+            self.fields["name"].focus_set()
+
+    def _focus_suggestions(self, event=None):
+        if self.suggestion_list.winfo_ismapped():
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, tk.END)
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+            return "break"
+
+    def _choose_suggestion(self):
+        selection = self.suggestion_list.curselection()
+        if not selection:
+            return
+        suggestion = self._suggestions[selection[0]]
+        # A choice ends the current search; late results for older keystrokes are dropped.
+        self._suggest_generation += 1
+        for key, entry in self.fields.items():
+            value = suggestion.get(key)
+            if value is None or value == "":
+                continue
+            if isinstance(value, (int, float, Decimal)):
+                value = f"{float(value):g}"
+            entry.delete(0, tk.END)
+            entry.insert(0, str(value))
+        self._hide_suggestions(focus_name=True)
+
+    def _on_destroy(self, event=None):
+        if event is not None and event.widget is not self:
+            return
+        self._suggest_generation += 1
+        if self._suggest_job is not None:
+            self.after_cancel(self._suggest_job)
+            self._suggest_job = None
+
     def _add_entry_row(self, parent, row_num, key, label):
         ttk.Label(
             parent,
@@ -345,6 +545,8 @@ class AddItemWindow(tk.Toplevel):
 
         entry = ttk.Entry(parent)
         entry.grid(row=row_num, column=1, sticky="ew", pady=4)
+        if self.prefill.get(key):
+            entry.insert(0, str(self.prefill[key]))
         self.fields[key] = entry
 
     def _on_save(self):
@@ -445,6 +647,7 @@ class CategoriesWindow(tk.Toplevel):
         delete_frame = ttk.Frame(frame)
         delete_frame.pack(fill=tk.X, pady=(10, 0))
         ttk.Button(delete_frame, text="Delete selected", command=self._on_delete_cat).pack(side=tk.LEFT)
+        ttk.Button(delete_frame, text="Set minimum stock", command=self._on_set_min_stock).pack(side=tk.LEFT, padx=(8, 0))
         ttk.Button(frame, text="Close", command=self.destroy).pack(anchor="e", pady=(16, 0))
 
     def _refresh_category_listbox(self):
@@ -462,6 +665,29 @@ class CategoriesWindow(tk.Toplevel):
             self.new_cat_var.set("")
             self._refresh_category_listbox()
 
+    def _on_set_min_stock(self):
+        idx = self.cat_listbox.curselection()
+        if not idx:
+            return
+        cat_id, name = self._categories_cache[idx[0]]
+        raw = simpledialog.askstring(
+            "Minimum stock",
+            f"Alert when '{name}' holds fewer than this many items.\n(Leave blank to clear the threshold.)",
+            parent=self,
+        )
+        if raw is None:
+            return
+        raw = raw.strip()
+        if raw:
+            try:
+                if float(raw) < 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showwarning("Invalid value", "Minimum stock must be a positive number or blank.", parent=self)
+                return
+        set_category_min_stock(cat_id, raw or None)
+        self.refresh_callback()
+
     def _on_delete_cat(self):
         idx = self.cat_listbox.curselection()
         if idx:
@@ -473,16 +699,19 @@ class CategoriesWindow(tk.Toplevel):
 
 
 class FilterWindow(tk.Toplevel):
-    def __init__(self, master, current_filter_id, update_filter_callback, style_config):
+    def __init__(self, master, current_filter_id, update_filter_callback, style_config,
+                 current_text="", current_age=AGE_FILTERS[0][0]):
         super().__init__(master)
         self.master = master
         self.current_filter_id = current_filter_id
+        self.current_text = current_text
+        self.current_age = current_age
         self.update_filter_callback = update_filter_callback
         self.style_config = style_config
         self.cats = get_all_storage_categories()
 
         self.title("Search & filter")
-        self.geometry("360x220")
+        self.geometry("360x340")
         self.configure(bg=self.style_config["bg_main"])
         self.transient(master)
         self.grab_set()
@@ -505,21 +734,207 @@ class FilterWindow(tk.Toplevel):
                     break
 
         cat_var = tk.StringVar(value=cat_names[curr_idx])
-        ttk.Combobox(frame, textvariable=cat_var, values=cat_names, state="readonly").pack(fill=tk.X, pady=(6, 16))
+        ttk.Combobox(frame, textvariable=cat_var, values=cat_names, state="readonly").pack(fill=tk.X, pady=(6, 12))
+
+        ttk.Label(frame, text="Name or barcode contains:", background=self.style_config["bg_main"]).pack(anchor="w")
+        text_var = tk.StringVar(value=self.current_text)
+        text_entry = ttk.Entry(frame, textvariable=text_var)
+        text_entry.pack(fill=tk.X, pady=(6, 12))
+
+        ttk.Label(frame, text="Last scanned:", background=self.style_config["bg_main"]).pack(anchor="w")
+        age_var = tk.StringVar(value=self.current_age)
+        ttk.Combobox(
+            frame, textvariable=age_var, values=[label for label, _min, _max in AGE_FILTERS], state="readonly"
+        ).pack(fill=tk.X, pady=(6, 16))
+
+        apply = lambda: self._apply_filter(cat_var.get(), text_var.get(), age_var.get())
+        text_entry.bind("<Return>", lambda e: apply())
 
         btn_frame = ttk.Frame(frame)
         btn_frame.pack(fill=tk.X)
-        ttk.Button(btn_frame, text="Clear filter", command=lambda: self._apply_filter(cat_var.get(), True)).pack(side=tk.RIGHT)
-        ttk.Button(btn_frame, text="Apply filter", command=lambda: self._apply_filter(cat_var.get())).pack(side=tk.RIGHT, padx=(0, 8))
-        
-    def _apply_filter(self, choice, clear=False):
+        ttk.Button(btn_frame, text="Clear filter", command=lambda: self._apply_filter(None, clear=True)).pack(side=tk.RIGHT)
+        ttk.Button(btn_frame, text="Apply filter", command=apply).pack(side=tk.RIGHT, padx=(0, 8))
+
+    def _apply_filter(self, choice, text="", age=AGE_FILTERS[0][0], clear=False):
         new_id, new_name = None, "All locations"
-        if not clear and choice != "All locations":
+        if clear:
+            text, age = "", AGE_FILTERS[0][0]
+        elif choice != "All locations":
             for cid, name in self.cats:
                 if name == choice:
                     new_id, new_name = cid, name
                     break
-        self.update_filter_callback(new_id, new_name)
+        self.update_filter_callback(new_id, new_name, text, age)
         self.destroy()
 
 
+
+
+class StocktakeWindow(tk.Toplevel):
+    """Scan a whole location into a local buffer, preview the reconciliation, apply it once."""
+
+    ACTION_LABELS = {
+        "add": "Add",
+        "move": "Move here",
+        "set": "Correct qty",
+        "remove": "Remove",
+    }
+
+    def __init__(self, master, current_filter_id, refresh_callback, style_config):
+        super().__init__(master)
+        self.master = master
+        self.refresh_callback = refresh_callback
+        self.style_config = style_config
+        self.cats = get_all_storage_categories()
+        self.counts = {}
+        self.plan = []
+
+        self.title("Stocktake")
+        self.geometry("560x600")
+        self.configure(bg=self.style_config["bg_main"])
+        self.transient(master)
+        self.grab_set()
+
+        self._create_widgets(current_filter_id)
+        _center_window(self)
+        self.scan_entry.focus_set()
+
+        # Scanner bursts come here (not to the pantry page) while this window is open.
+        self._scanner = get_scanner_input(master)
+        self._scanner.push_consumer(self, self._count_barcode)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
+    def _on_destroy(self, event=None):
+        if event is not None and event.widget is not self:
+            return
+        self._scanner.remove_consumer(self._count_barcode)
+
+    def _create_widgets(self, current_filter_id):
+        frame = ttk.Frame(self, padding=16)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text="Stocktake", style="DetailTitle.TLabel").pack(anchor="w")
+        ttk.Label(
+            frame,
+            text="Pick a location, scan everything on it, then preview and apply.",
+            background=self.style_config["bg_main"],
+            foreground=self.style_config["text_muted"],
+        ).pack(anchor="w", pady=(0, 8))
+
+        cat_names = ["No location"] + [name for (_id, name) in self.cats]
+        curr_idx = 0
+        for i, (cid, _name) in enumerate(self.cats):
+            if cid == current_filter_id:
+                curr_idx = i + 1
+                break
+        self.cat_var = tk.StringVar(value=cat_names[curr_idx])
+        cat_box = ttk.Combobox(frame, textvariable=self.cat_var, values=cat_names, state="readonly")
+        cat_box.pack(fill=tk.X)
+        cat_box.bind("<<ComboboxSelected>>", lambda e: self._on_location_changed())
+
+        self.scan_entry = ttk.Entry(frame)
+        self.scan_entry.pack(fill=tk.X, pady=(8, 4))
+        self.scan_entry.bind("<Return>", self._on_scan)
+
+        self.status_label = ttk.Label(frame, text="0 scans", style="Filter.TLabel")
+        self.status_label.pack(anchor="w")
+
+        self.tree = ttk.Treeview(
+            frame,
+            columns=("action", "name", "old", "new"),
+            show="headings",
+            style="Custom.Treeview",
+            selectmode="none",
+            height=8,
+        )
+        self.tree.heading("action", text="Change", anchor="w")
+        self.tree.heading("name", text="Food", anchor="w")
+        self.tree.heading("old", text="Was", anchor="center")
+        self.tree.heading("new", text="Now", anchor="center")
+        self.tree.column("action", width=110, stretch=False)
+        self.tree.column("name", width=250, stretch=True)
+        self.tree.column("old", width=60, anchor="center", stretch=False)
+        self.tree.column("new", width=60, anchor="center", stretch=False)
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=(8, 0))
+
+        actions = ttk.Frame(frame)
+        actions.pack(fill=tk.X, pady=(12, 0))
+        ttk.Button(actions, text="Close", command=self.destroy).pack(side=tk.RIGHT)
+        self.apply_button = ttk.Button(actions, text="Apply", command=self._on_apply, state="disabled")
+        self.apply_button.pack(side=tk.RIGHT, padx=(0, 8))
+        ttk.Button(actions, text="Preview", command=self._on_preview).pack(side=tk.RIGHT, padx=(0, 8))
+        ttk.Button(actions, text="Clear scans", command=self._on_clear).pack(side=tk.LEFT)
+
+    def _selected_category_id(self):
+        choice = self.cat_var.get()
+        for cid, name in self.cats:
+            if name == choice:
+                return cid
+        return None
+
+    def _on_scan(self, event=None):
+        # Typed by hand; scanner bursts arrive through _count_barcode.
+        barcode = self.scan_entry.get().strip()
+        self.scan_entry.delete(0, tk.END)
+        if barcode:
+            self._count_barcode(barcode)
+
+    def _count_barcode(self, barcode):
+        self.counts[barcode] = self.counts.get(barcode, 0) + 1
+        self._invalidate_plan()
+        total = sum(self.counts.values())
+        self.status_label.config(text=f"{total} scans, {len(self.counts)} distinct barcodes (last: {barcode})")
+
+    def _on_location_changed(self):
+        self._invalidate_plan()
+        self.scan_entry.focus_set()
+
+    def _on_clear(self):
+        self.counts.clear()
+        self._invalidate_plan()
+        self.status_label.config(text="0 scans")
+        self.scan_entry.focus_set()
+
+    def _invalidate_plan(self):
+        self.plan = []
+        self.apply_button.config(state="disabled")
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+
+    def _on_preview(self):
+        self._invalidate_plan()
+        self.plan, unknown = plan_stocktake(self._selected_category_id(), self.counts)
+        for step in self.plan:
+            self.tree.insert(
+                "",
+                tk.END,
+                values=(
+                    self.ACTION_LABELS[step["action"]],
+                    step["name"],
+                    f"{float(step['old_quantity']):g}",
+                    f"{float(step['new_quantity']):g}",
+                ),
+            )
+        if unknown:
+            messagebox.showwarning(
+                "Unknown barcodes",
+                "These barcodes are not in the product list and will be skipped:\n" + "\n".join(unknown),
+                parent=self,
+            )
+        if self.plan:
+            self.apply_button.config(state="normal")
+        else:
+            self.status_label.config(text="Location already matches the scan.")
+        self.scan_entry.focus_set()
+
+    def _on_apply(self):
+        if not self.plan:
+            return
+        if not messagebox.askokcancel("Apply stocktake", f"Apply {len(self.plan)} change(s)?", parent=self):
+            return
+        ok, error_message = apply_stocktake(self._selected_category_id(), self.plan)
+        if not ok:
+            messagebox.showerror("Stocktake failed", error_message, parent=self)
+            return
+        self.refresh_callback()
+        self.destroy()
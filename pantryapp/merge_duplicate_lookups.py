@@ -0,0 +1,339 @@
+"""merge_duplicate_lookups.py
+
+Maintenance command: find duplicate item_lookup rows and merge them.
+
+Duplicates come from add_manual_lookup_and_item / get_new_item_lookup_from_api
+inserting a new lookup whenever a barcode variant (e.g. with or without leading
+zeros) is not matched. Two lookups are grouped when:
+  - their barcodes normalize to the same digits (leading zeros stripped), or
+  - their name + brand tokens are near-identical (MinHash/LSH blocking, then an
+    exact Jaccard check) and their barcodes don't conflict (one side missing).
+
+Both passes are hash-based, so candidate generation is linear in the number of
+rows; no all-pairs comparison is made.
+
+For each group the most complete lookup wins. item rows pointing at the losers
+are repointed (or folded into the winner's item row, summing quantities, with
+recipe_item references moved along), then the losers are deleted. Groups are
+written in batches, one transaction per batch.
+
+Usage (dry run by default):
+    python -m pantryapp.merge_duplicate_lookups
+    python -m pantryapp.merge_duplicate_lookups --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import zlib
+from collections import defaultdict
+
+from sqlalchemy import text
+
+from database import engine
+
+FUZZY_THRESHOLD = 0.8
+MINHASH_BANDS = 6
+MINHASH_ROWS = 2
+MAX_BUCKET_SIZE = 200  # buckets bigger than this are generic words, not duplicates
+BATCH_SIZE = 200
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MINHASH_PARAMS = [
+    ((i * 0x9E3779B1 + 1) % _MERSENNE_PRIME, (i * 0x85EBCA77 + 7) % _MERSENNE_PRIME)
+    for i in range(1, MINHASH_BANDS * MINHASH_ROWS + 1)
+]
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Columns that make a lookup "more complete" when picking the winner.
+_DETAIL_COLUMNS = (
+    "description", "quantity", "brand", "categories", "energy_kcal_100g", "fat_100g",
+    "saturated_fat_100g", "carbs_100g", "sugars_100g", "proteins_100g", "salt_100g",
+)
+
+
+# --- Grouping ---
+
+def normalize_barcode(barcode):
+    digits = re.sub(r"\D", "", str(barcode or ""))
+    return digits.lstrip("0") or None
+
+
+def name_tokens(name, brand):
+    return frozenset(_TOKEN_RE.findall(f"{brand or ''} {name or ''}".lower()))
+
+
+def _minhash_bands(tokens):
+    hashed = [zlib.crc32(t.encode()) for t in tokens]
+    signature = [min((a * h + b) % _MERSENNE_PRIME for h in hashed) for a, b in _MINHASH_PARAMS]
+    return [
+        (band, tuple(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]))
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+class _UnionFind:
+    """Union-find that also tracks the (single) normalized barcode of each group."""
+
+    def __init__(self):
+        self.parent = {}
+        self.barcode = {}
+
+    def find(self, x):
+        root = x
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while x != root:
+            self.parent[x], x = root, self.parent.get(x, x)
+        return root
+
+    def conflicts(self, a, b):
+        ba, bb = self.barcode.get(self.find(a)), self.barcode.get(self.find(b))
+        return ba is not None and bb is not None and ba != bb
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            root, child = min(ra, rb), max(ra, rb)
+            self.parent[child] = root
+            if self.barcode.get(root) is None:
+                self.barcode[root] = self.barcode.get(child)
+
+
+def find_duplicate_groups(rows, fuzzy=True, threshold=FUZZY_THRESHOLD):
+    """
+    rows: iterable of (item_lookup_id, barcode, item_name, brand).
+    Returns (groups, review) where groups is a list of sorted id lists (size >= 2)
+    and review lists fuzzy (id, id, similarity) pairs skipped because their
+    groups carry different barcodes.
+    """
+    uf = _UnionFind()
+    by_barcode = {}
+    barcode_of = {}
+    tokens_of = {}
+    buckets = defaultdict(list)
+
+    for lookup_id, barcode, name, brand in rows:
+        key = normalize_barcode(barcode)
+        barcode_of[lookup_id] = key
+        uf.barcode[lookup_id] = key
+        if key is not None:
+            if key in by_barcode:
+                uf.union(by_barcode[key], lookup_id)
+            else:
+                by_barcode[key] = lookup_id
+
+        if fuzzy:
+            tokens = name_tokens(name, brand)
+            if tokens:
+                tokens_of[lookup_id] = tokens
+                for band_key in _minhash_bands(tokens):
+                    buckets[band_key].append(lookup_id)
+
+    review = []
+    seen_pairs = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > MAX_BUCKET_SIZE:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if (a, b) in seen_pairs or uf.find(a) == uf.find(b):
+                    continue
+                seen_pairs.add((a, b))
+                ta, tb = tokens_of[a], tokens_of[b]
+                similarity = len(ta & tb) / len(ta | tb)
+                if similarity < threshold:
+                    continue
+                # Never let a fuzzy match join two groups that carry different barcodes.
+                if uf.conflicts(a, b):
+                    review.append((a, b, similarity))
+                    continue
+                uf.union(a, b)
+
+    groups = defaultdict(list)
+    for lookup_id in barcode_of:
+        groups[uf.find(lookup_id)].append(lookup_id)
+    return [sorted(g) for g in groups.values() if len(g) > 1], review
+
+
+# --- Merging ---
+
+def _pick_winner(conn, group):
+    cols = ", ".join(_DETAIL_COLUMNS)
+    rows = conn.execute(
+        text(f"SELECT item_lookup_id, {cols} FROM item_lookup WHERE item_lookup_id = ANY(:ids)"),
+        {"ids": group},
+    ).fetchall()
+    if not rows:
+        return None
+    # Most filled-in metadata wins; the oldest row breaks ties.
+    best = max(rows, key=lambda r: (sum(v is not None for v in r[1:]), -r[0]))
+    return best[0]
+
+
+def _merge_item_into(conn, loser_item_id, winner_item_id, quantity, last_scanned):
+    conn.execute(
+        text(
+            """
+            UPDATE item
+            SET quantity = quantity + :quantity,
+                last_scanned = GREATEST(last_scanned, :last_scanned)
+            WHERE item_id = :winner_item_id
+            """
+        ),
+        {"quantity": quantity, "last_scanned": last_scanned, "winner_item_id": winner_item_id},
+    )
+
+    recipe_rows = conn.execute(
+        text("SELECT recipe_item_id, recipe_id, item_quantity FROM recipe_item WHERE item_id = :item_id"),
+        {"item_id": loser_item_id},
+    ).fetchall()
+    for recipe_item_id, recipe_id, item_quantity in recipe_rows:
+        # recipe_item is UNIQUE (recipe_id, item_id): fold into an existing row when present.
+        merged = conn.execute(
+            text(
+                """
+                UPDATE recipe_item SET item_quantity = item_quantity + :item_quantity
+                WHERE recipe_id = :recipe_id AND item_id = :winner_item_id
+                """
+            ),
+            {"item_quantity": item_quantity, "recipe_id": recipe_id, "winner_item_id": winner_item_id},
+        ).rowcount
+        if merged:
+            conn.execute(text("DELETE FROM recipe_item WHERE recipe_item_id = :id"), {"id": recipe_item_id})
+        else:
+            conn.execute(
+                text("UPDATE recipe_item SET item_id = :winner_item_id WHERE recipe_item_id = :id"),
+                {"winner_item_id": winner_item_id, "id": recipe_item_id},
+            )
+
+    conn.execute(text("DELETE FROM item WHERE item_id = :item_id"), {"item_id": loser_item_id})
+
+
+def merge_group(conn, group):
+    """Merge one duplicate group inside the caller's transaction. Returns the winner id."""
+    winner = _pick_winner(conn, group)
+    if winner is None:
+        return None
+    losers = [g for g in group if g != winner]
+
+    items = conn.execute(
+        text(
+            """
+            SELECT item_id, item_lookup_id, quantity, last_scanned, storage_categories_id
+            FROM item
+            WHERE item_lookup_id = ANY(:ids)
+            ORDER BY (item_lookup_id = :winner) DESC, item_id
+            """
+        ),
+        {"ids": group, "winner": winner},
+    ).fetchall()
+
+    winner_item_id = None
+    touched_categories = set()
+    for item_id, item_lookup_id, quantity, last_scanned, category_id in items:
+        if category_id is not None:
+            touched_categories.add(category_id)
+        if winner_item_id is None:
+            winner_item_id = item_id
+            if item_lookup_id != winner:
+                conn.execute(
+                    text("UPDATE item SET item_lookup_id = :winner WHERE item_id = :item_id"),
+                    {"winner": winner, "item_id": item_id},
+                )
+            continue
+        _merge_item_into(conn, item_id, winner_item_id, quantity, last_scanned)
+
+    conn.execute(
+        text(
+            """
+            UPDATE item_lookup
+            SET min_stock = COALESCE(
+                    min_stock,
+                    (SELECT MAX(min_stock) FROM item_lookup WHERE item_lookup_id = ANY(:losers))
+                )
+            WHERE item_lookup_id = :winner
+            """
+        ),
+        {"winner": winner, "losers": losers},
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE item_lookup
+            SET need_refill = (
+                min_stock IS NOT NULL
+                AND COALESCE((SELECT SUM(quantity) FROM item WHERE item_lookup_id = :winner), 0) < min_stock
+            )
+            WHERE item_lookup_id = :winner
+            """
+        ),
+        {"winner": winner},
+    )
+    if touched_categories:
+        # Folding rows moves quantity between locations; keep their flags current too.
+        conn.execute(
+            text(
+                """
+                UPDATE storage_categories
+                SET need_refill = (
+                    min_stock IS NOT NULL
+                    AND COALESCE(
+                        (SELECT SUM(quantity) FROM item
+                         WHERE item.storage_categories_id = storage_categories.storage_categories_id),
+                        0
+                    ) < min_stock
+                )
+                WHERE storage_categories_id = ANY(:categories)
+                """
+            ),
+            {"categories": sorted(touched_categories)},
+        )
+    conn.execute(text("DELETE FROM item_lookup WHERE item_lookup_id = ANY(:losers)"), {"losers": losers})
+    return winner
+
+
+def _load_lookup_rows():
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=5000).execute(
+            text("SELECT item_lookup_id, barcode, item_name, brand FROM item_lookup")
+        )
+        for row in result:
+            yield tuple(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find and merge duplicate item_lookup rows.")
+    parser.add_argument("--apply", action="store_true", help="write the merges (default is a dry run)")
+    parser.add_argument("--no-fuzzy", action="store_true", help="only group by normalized barcode")
+    parser.add_argument("--threshold", type=float, default=FUZZY_THRESHOLD,
+                        help=f"name/brand Jaccard similarity for fuzzy matches (default {FUZZY_THRESHOLD})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="groups per transaction")
+    args = parser.parse_args(argv)
+
+    groups, review = find_duplicate_groups(_load_lookup_rows(), fuzzy=not args.no_fuzzy, threshold=args.threshold)
+    duplicates = sum(len(g) - 1 for g in groups)
+    print(f"Found {len(groups)} duplicate groups ({duplicates} lookups to remove).")
+    for a, b, similarity in review[:50]:
+        print(f"  review: lookups {a} and {b} look alike ({similarity:.2f}) but have different barcodes")
+
+    if not args.apply:
+        for group in groups[:50]:
+            print(f"  group: {group}")
+        print("Dry run; pass --apply to merge.")
+        return
+
+    merged = 0
+    for start in range(0, len(groups), args.batch_size):
+        batch = groups[start:start + args.batch_size]
+        with engine.begin() as conn:
+            for group in batch:
+                if merge_group(conn, group) is not None:
+                    merged += 1
+        print(f"Merged {merged}/{len(groups)} groups...")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,34 +7,86 @@ This file intentionally stays modular:
   - PantryApp: standalone runner for the pantry module only.
 
 The UI + behavior matches the previous single-file PantryApp (old app.py),
-including barcode-scanner <Return> capture, categories, filtering, and details.
+including barcode-scanner capture, categories, filtering, and details.
 """
 
 from __future__ import annotations
 
+import heapq
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
 from typing import Callable, Optional
 from banner import TopBanner
 # from database import init_db_schema
 from .pantry_model import (
-    add_item,
-    remove_item,
     get_all_items,
+    get_item_by_id,
     get_item_lookup_by_id,
+    get_item_lookups_by_ids,
     get_all_storage_categories,
     assign_item_to_category,
+    expire_cached_rows,
+    can_undo,
+    undo_conflicts,
+    undo_last,
 )
+from .change_feed import ChangeFeed
+from .scan_pipeline import ScanPipeline
+from .scanner_input import get_scanner_input
+from .scanner_devices import ScannerDevices
+from .pantry_snapshot import PantrySnapshot, AGE_FILTERS, ALL_LOCATIONS
+from .details_cache import DetailsCache
 from .gui_windows import (
     ItemDetailsWindow,
+    load_item_details,
     CategoriesWindow,
     FilterWindow,
     UnknownBarcodeDialog,
     AddItemWindow,
+    StocktakeWindow,
 )
 
 
+def _barcode_key(barcode) -> str:
+    """Normalize a barcode for matching scans to rows (leading zeros vary between sources)."""
+    raw = str(barcode or "").strip()
+    return raw.lstrip("0") or raw
+
+
+def _as_datetime(last_scanned) -> Optional[datetime]:
+    if not last_scanned:
+        return None
+    if isinstance(last_scanned, datetime):
+        return last_scanned
+    try:
+        return datetime.fromisoformat(str(last_scanned))
+    except ValueError:
+        return None
+
+
+def _age_bucket(last_scanned: Optional[datetime], now: datetime) -> tuple[str, float]:
+    """Age text for the tree plus seconds until that text next changes."""
+    if last_scanned is None:
+        return "-", float("inf")
+    elapsed = (now - last_scanned).total_seconds()
+    seconds = int(elapsed)
+    if seconds <= 0:
+        return "0s", 1 - elapsed
+    if seconds < 60:
+        return f"{seconds}s", seconds + 1 - elapsed
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}m", (minutes + 1) * 60 - elapsed
+    hours = minutes // 60
+    if hours < 48:
+        return f"{hours}h", (hours + 1) * 3600 - elapsed
+    days = hours // 24
+    return f"{days}d", (days + 1) * 86400 - elapsed
+
+
 class PantryPage(ttk.Frame):
     """Embeddable Pantry UI.
 
@@ -43,6 +95,7 @@ class PantryPage(ttk.Frame):
     """
 
     STYLE_CONFIG: dict[str, str] = {}
+    HEADINGS = {"name": "Food", "location": "Location", "age": "Age", "quantity": "Qty"}
 
     def __init__(
         self,
@@ -58,7 +111,29 @@ class PantryPage(ttk.Frame):
 
         self.mode = "add"
         self.current_category_filter_id: Optional[int] = None
+        self.filter_text = ""
+        self.age_filter = AGE_FILTERS[0][0]
+        self.sort_column: Optional[str] = None
+        self.sort_descending = False
+        # Every item, columnar; filters and sorting are computed from this without a DB query.
+        self._snapshot = PantrySnapshot()
         self._barcode_by_tree_iid: dict[str, str] = {}
+        self._lookup_id_by_tree_iid: dict[str, int] = {}
+        self._cat_id_by_tree_iid: dict[str, Optional[int]] = {}
+        self._values_by_tree_iid: dict[str, tuple] = {}
+        # Age column: last_scanned per row, and a heap of (next bucket change, iid) driving one timer.
+        self._last_scanned_by_tree_iid: dict[str, Optional[datetime]] = {}
+        self._age_due_by_tree_iid: dict[str, datetime] = {}
+        self._age_heap: list[tuple[datetime, str]] = []
+        self._age_job = None
+        self._age_job_due: Optional[datetime] = None
+        self._tree_iid_by_barcode: dict[str, str] = {}
+        self._scan_pending: dict[str, int] = {}
+        self._unknown_barcodes: list[tuple[str, Optional[dict]]] = []
+        self._prompting_unknown = False
+        self._cat_map: dict[int, str] = {}
+        self._pending_changes: set = set()
+        self._pending_changes_job = None
 
         TopBanner(self, title="Pantry", on_home=self.on_home).pack(side=tk.TOP, fill=tk.X)
         self._setup_style()
@@ -66,6 +141,21 @@ class PantryPage(ttk.Frame):
 
         self.refresh_items()
 
+        # Other kiosks' scans arrive through the change feed; only affected rows are patched.
+        self._change_feed = ChangeFeed(self._on_remote_changes)
+        self._change_feed.start()
+
+        # Scans are written on a worker so the scanner never waits on the DB.
+        self._scan_pipeline = ScanPipeline(self, self._on_scan_result)
+        # Scanner bursts are queued independent of focus and held while a dialog is modal.
+        self._scanner = get_scanner_input(self)
+        self._details_cache = DetailsCache(self, load_item_details)
+        self._hovered_iid = ""
+        # Directly-read scanners (PANTRY_SCANNERS) feed the pantry even when it isn't shown.
+        self._scanner_devices = ScannerDevices.from_env(self._on_device_barcode)
+        self._scanner_devices.start()
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
     # --------- Styling (kept consistent with your existing modern palette) ---------
 
     def _setup_style(self) -> None:
@@ -235,7 +325,7 @@ class PantryPage(ttk.Frame):
         # --------- Second row: Categories + Filter ----------
         nav_frame = ttk.Frame(main_frame)
         nav_frame.grid(row=1, column=0, sticky="ew", padx=12, pady=(4, 6))
-        nav_frame.grid_columnconfigure(3, weight=1)
+        nav_frame.grid_columnconfigure(5, weight=1)
 
         self.categories_button = ttk.Button(
             nav_frame,
@@ -253,8 +343,24 @@ class PantryPage(ttk.Frame):
         )
         self.filter_button.grid(row=0, column=1, sticky="w", padx=(0, 8))
 
+        self.stocktake_button = ttk.Button(
+            nav_frame,
+            text="Stocktake",
+            style="TopNav.TButton",
+            command=self.open_stocktake_window,
+        )
+        self.stocktake_button.grid(row=0, column=2, sticky="w", padx=(0, 8))
+
+        self.undo_button = ttk.Button(
+            nav_frame,
+            text="Undo",
+            style="TopNav.TButton",
+            command=self.undo_last_change,
+        )
+        self.undo_button.grid(row=0, column=3, sticky="w", padx=(0, 8))
+
         self.filter_label = ttk.Label(nav_frame, text="Filter: All locations", style="Filter.TLabel")
-        self.filter_label.grid(row=0, column=2, sticky="w", padx=(6, 0))
+        self.filter_label.grid(row=0, column=4, sticky="w", padx=(6, 0))
 
         # --------- Center: Card with list ----------
         card_frame = ttk.Frame(main_frame, style="Card.TFrame", padding=10)
@@ -275,6 +381,8 @@ class PantryPage(ttk.Frame):
         self.tree.heading("location", text="Location", anchor="center")
         self.tree.heading("age", text="Age", anchor="center")
         self.tree.heading("quantity", text="Qty", anchor="center")
+        for column in self.HEADINGS:
+            self.tree.heading(column, command=lambda c=column: self.sort_by_column(c))
 
         self.tree.column("name", anchor="w", width=420, stretch=True)
         self.tree.column("location", anchor="center", width=150, stretch=False)
@@ -290,6 +398,9 @@ class PantryPage(ttk.Frame):
 
         self.tree.bind("<Double-1>", self.on_item_activated)
         self.tree.bind("<Button-1>", self.on_tree_click, add="+")
+        # Load details for the row being pointed at / selected before it is opened.
+        self.tree.bind("<Motion>", self._on_tree_hover, add="+")
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self._prefetch_details(self.tree.focus()), add="+")
 
         self.winfo_toplevel().bind("<Configure>", self._on_root_configure, add="+")
 
@@ -315,7 +426,7 @@ class PantryPage(ttk.Frame):
         )
         self.remove_button.grid(row=0, column=1, sticky="ew", padx=(6, 0))
 
-        # Hidden barcode entry for scanner
+        # Hidden entry for barcodes typed by hand; scanner bursts go through ScannerInput
         self.barcode_entry = ttk.Entry(self)
         self.barcode_entry.place(x=-1000, y=-1000)
 
@@ -360,78 +471,290 @@ class PantryPage(ttk.Frame):
         """Call when this page is shown to capture scanner input."""
         root = self.winfo_toplevel()
         root.bind("<Return>", self.on_barcode_scanned)
+        root.bind("<Control-z>", self.undo_last_change)
+        self._scanner.push_consumer(self, self._on_scanner_barcode)
         self.focus_barcode_entry()
 
     def deactivate(self) -> None:
         """Call when this page is hidden."""
         root = self.winfo_toplevel()
         root.unbind("<Return>")
+        root.unbind("<Control-z>")
+        self._scanner.remove_consumer(self._on_scanner_barcode)
 
     # ---------- Time since scan formatting ----------
 
     def _format_age(self, last_scanned) -> str:
-        if not last_scanned:
-            return "-"
-        if isinstance(last_scanned, datetime):
-            t = last_scanned
-        else:
-            try:
-                t = datetime.fromisoformat(str(last_scanned))
-            except ValueError:
-                return "-"
-
-        delta = datetime.now() - t
-        seconds = int(delta.total_seconds())
-        if seconds < 0:
-            return "0s"
-        if seconds < 60:
-            return f"{seconds}s"
-        minutes = seconds // 60
-        if minutes < 60:
-            return f"{minutes}m"
-        hours = minutes // 60
-        if hours < 48:
-            return f"{hours}h"
-        days = hours // 24
-        return f"{days}d"
+        return _age_bucket(_as_datetime(last_scanned), datetime.now())[0]
+
+    def _schedule_age(self, iid: str, last_scanned: Optional[datetime], now: datetime) -> None:
+        """Queue the row for its next bucket change (s -> m -> h -> d); no timer for rows without a scan."""
+        if last_scanned is None:
+            self._age_due_by_tree_iid.pop(iid, None)
+            return
+        due = now + timedelta(seconds=_age_bucket(last_scanned, now)[1])
+        self._age_due_by_tree_iid[iid] = due
+        heapq.heappush(self._age_heap, (due, iid))
+        if len(self._age_heap) > 2 * len(self._age_due_by_tree_iid) + 64:
+            # Drop superseded entries left behind by reloads.
+            self._age_heap = [(d, i) for i, d in self._age_due_by_tree_iid.items()]
+            heapq.heapify(self._age_heap)
+        self._arm_age_timer()
+
+    def _arm_age_timer(self) -> None:
+        """Keep one timer, set for the earliest pending bucket change."""
+        while self._age_heap and self._age_due_by_tree_iid.get(self._age_heap[0][1]) != self._age_heap[0][0]:
+            heapq.heappop(self._age_heap)
+        if not self._age_heap:
+            return
+        due = self._age_heap[0][0]
+        if self._age_job is not None:
+            if self._age_job_due <= due:
+                return
+            self.after_cancel(self._age_job)
+        delay_ms = max(0, int((due - datetime.now()).total_seconds() * 1000)) + 10
+        self._age_job_due = due
+        self._age_job = self.after(delay_ms, self._on_age_tick)
+
+    def _on_age_tick(self) -> None:
+        self._age_job = None
+        now = datetime.now()
+        while self._age_heap and self._age_heap[0][0] <= now:
+            due, iid = heapq.heappop(self._age_heap)
+            if self._age_due_by_tree_iid.get(iid) != due:
+                continue
+            del self._age_due_by_tree_iid[iid]
+            last_scanned = self._last_scanned_by_tree_iid.get(iid)
+            values = self._values_by_tree_iid.get(iid)
+            if last_scanned is None or values is None:
+                continue
+            self._set_row(iid, values[:2] + (self._format_age(last_scanned),) + values[3:])
+            self._schedule_age(iid, last_scanned, now)
+        self._arm_age_timer()
 
     # ---------- List refresh ----------
 
     def refresh_items(self) -> None:
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        self._barcode_by_tree_iid.clear()
-
-        # get_all_items and get_all_item_lookups
-        items = get_all_items(category_id=self.current_category_filter_id)
-        cat_map = {cid: name for cid, name in get_all_storage_categories()}
+        """Reload every item from the DB into the snapshot, then redraw the filtered view."""
+        items = get_all_items()
+        self._cat_map = {cid: name for cid, name in get_all_storage_categories()}
+        lookups = get_item_lookups_by_ids({item.item_lookup_id for item in items})
 
+        self._snapshot.clear()
         for item in items:
-            item_lookup = get_item_lookup_by_id(item.item_lookup_id)
-            item_name = item_lookup.item_name if item_lookup else "Unknown Item"
-            quantity = item.quantity if item.quantity is not None else 0
-            cat_id = getattr(item, "storage_categories_id", None)
-            display_location = cat_map.get(cat_id, "-") if cat_id is not None else "-"
-            age_text = self._format_age(getattr(item, "last_scanned", None))
-
-            barcode = str(getattr(item_lookup, "barcode", "") or "").strip()
-            iid = f"item-{item.item_id}"
-            if barcode:
-                self._barcode_by_tree_iid[iid] = barcode
-            else:
-                self._barcode_by_tree_iid[iid] = str(item.item_id)
-
-            self.tree.insert(
-                "",
-                tk.END,
-                iid=iid,
-                values=(
-                    item_name,
-                    display_location,
-                    age_text,
-                    quantity
-                ),
-            )
+            self._store_item(item, lookups.get(item.item_lookup_id))
+        self._apply_view()
+
+    def _store_item(self, item, item_lookup) -> int:
+        """Upsert one loaded item into the snapshot; returns its snapshot row."""
+        barcode = str(getattr(item_lookup, "barcode", "") or "").strip()
+        self._snapshot.upsert(
+            item.item_id,
+            item_lookup.item_name if item_lookup else None,
+            barcode,
+            item.item_lookup_id,
+            getattr(item, "storage_categories_id", None),
+            item.quantity,
+            _as_datetime(getattr(item, "last_scanned", None)),
+        )
+        return self._snapshot.row_of(item.item_id)
+
+    def _view_query(self, rows=None) -> list[int]:
+        _label, min_age, max_age = next(f for f in AGE_FILTERS if f[0] == self.age_filter)
+        category_id = self.current_category_filter_id
+        return self._snapshot.query(
+            category_id=ALL_LOCATIONS if category_id is None else category_id,
+            text=self.filter_text,
+            min_age=min_age,
+            max_age=max_age,
+            sort_column=self.sort_column,
+            descending=self.sort_descending,
+            location_names=self._cat_map,
+            rows=rows,
+        )
+
+    def _apply_view(self) -> None:
+        """Filter and sort the snapshot locally, then reconcile the tree with the result."""
+        wanted = []
+        for row in self._view_query():
+            iid = self._remember_row(row)
+            wanted.append((iid, self._row_values(row)))
+        self._reconcile_rows(wanted)
+
+    def _reconcile_rows(self, wanted) -> None:
+        """
+        Diff `wanted` (ordered (iid, values) pairs) against the previous snapshot:
+        delete vanished rows, insert new ones, update changed values and fix order.
+        Selection and scroll position survive because untouched rows are never recreated.
+        """
+        first_visible = self.tree.yview()[0]
+        wanted_iids = {iid for iid, _values in wanted}
+
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted_iids]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                self._forget_row(iid)
+
+        for index, (iid, values) in enumerate(wanted):
+            if iid not in self._values_by_tree_iid:
+                self.tree.insert("", index, iid=iid, values=values)
+            elif self._values_by_tree_iid[iid] != values:
+                self.tree.item(iid, values=values)
+            self._values_by_tree_iid[iid] = values
+
+        children = self.tree.get_children()
+        for index, (iid, _values) in enumerate(wanted):
+            if children[index] != iid:
+                # Order drifted (rare); move the remaining rows into place once.
+                for fix_index in range(index, len(wanted)):
+                    self.tree.move(wanted[fix_index][0], "", fix_index)
+                break
+
+        if self.tree.yview()[0] != first_visible:
+            self.tree.yview_moveto(first_visible)
+
+    def _remember_row(self, row: int) -> str:
+        snap = self._snapshot
+        item_id = snap.item_ids[row]
+        iid = f"item-{item_id}"
+        barcode = snap.barcodes[row]
+        self._barcode_by_tree_iid[iid] = barcode if barcode else str(item_id)
+        if barcode:
+            self._tree_iid_by_barcode[_barcode_key(barcode)] = iid
+        self._lookup_id_by_tree_iid[iid] = snap.lookup_ids[row]
+        self._cat_id_by_tree_iid[iid] = snap.cat_ids[row]
+        last_scanned = snap.last_scanned(row)
+        if self._last_scanned_by_tree_iid.get(iid, False) != last_scanned or iid not in self._age_due_by_tree_iid:
+            self._last_scanned_by_tree_iid[iid] = last_scanned
+            self._schedule_age(iid, last_scanned, datetime.now())
+        return iid
+
+    def _forget_row(self, iid: str) -> None:
+        barcode_key = _barcode_key(self._barcode_by_tree_iid.pop(iid, None))
+        if self._tree_iid_by_barcode.get(barcode_key) == iid:
+            del self._tree_iid_by_barcode[barcode_key]
+        self._lookup_id_by_tree_iid.pop(iid, None)
+        self._cat_id_by_tree_iid.pop(iid, None)
+        self._values_by_tree_iid.pop(iid, None)
+        self._last_scanned_by_tree_iid.pop(iid, None)
+        self._age_due_by_tree_iid.pop(iid, None)
+
+    def _set_row(self, iid: str, values: tuple) -> None:
+        """Insert or update a single row (appended when new) and keep the snapshot in sync."""
+        if iid not in self._values_by_tree_iid:
+            self.tree.insert("", tk.END, iid=iid, values=values)
+        elif self._values_by_tree_iid[iid] != values:
+            self.tree.item(iid, values=values)
+        self._values_by_tree_iid[iid] = values
+
+    def _row_values(self, row: int) -> tuple:
+        snap = self._snapshot
+        quantity = snap.quantities[row]
+        # Scans still in flight on the pipeline stay visible across reloads.
+        pending = self._scan_pending.get(_barcode_key(snap.barcodes[row]), 0)
+        if pending:
+            quantity = Decimal(str(quantity)) + pending
+        cat_id = snap.cat_ids[row]
+        display_location = self._cat_map.get(cat_id, "-") if cat_id is not None else "-"
+        age_text = _age_bucket(snap.last_scanned(row), datetime.now())[0]
+        return (snap.names[row], display_location, age_text, quantity)
+
+    # ---------- Change feed (cross-device updates) ----------
+
+    def _on_remote_changes(self, changes) -> None:
+        # Runs on the feed thread; hop onto the Tk thread.
+        try:
+            self.after(0, self._queue_remote_changes, changes)
+        except (RuntimeError, tk.TclError):
+            # Page is being torn down.
+            pass
+
+    def _queue_remote_changes(self, changes) -> None:
+        self._pending_changes.update(changes)
+        if self._pending_changes_job is None:
+            # Coalesce bursts (e.g. a stocktake on another kiosk) into one patch pass.
+            self._pending_changes_job = self.after(100, self._apply_remote_changes)
+
+    def _apply_remote_changes(self) -> None:
+        self._pending_changes_job = None
+        changes, self._pending_changes = self._pending_changes, set()
+        if not changes:
+            return
+
+        expire_cached_rows()
+        if any(table == "*" for table, _op, _row_id in changes):
+            # Missed changes could touch any row; cached details can't be trusted.
+            self._details_cache.clear()
+            self.refresh_items()
+            return
+
+        item_ids = {row_id for table, _op, row_id in changes if table == "item"}
+        lookup_ids = {row_id for table, _op, row_id in changes if table == "item_lookup"}
+        if lookup_ids:
+            for iid, lookup_id in list(self._lookup_id_by_tree_iid.items()):
+                if lookup_id in lookup_ids:
+                    item_ids.add(int(iid.split("-", 1)[1]))
+
+        self._evict_details(item_ids)
+        for item_id in item_ids:
+            self._patch_item_row(item_id)
+        # Rows new to this kiosk only have a known barcode once patched in.
+        self._evict_details(item_ids)
+
+        if any(table == "storage_categories" for table, _op, _row_id in changes):
+            # Renamed/deleted locations only change labels (and maybe sort order); no per-row queries.
+            self._cat_map = {cid: name for cid, name in get_all_storage_categories()}
+            self._apply_view()
+
+    def _evict_details(self, item_ids) -> None:
+        """Drop cached detail payloads (keyed by barcode) for these items."""
+        snap = self._snapshot
+        for item_id in item_ids:
+            row = snap.row_of(item_id)
+            if row is not None:
+                self._details_cache.invalidate(snap.barcodes[row] or str(item_id))
+
+    def _patch_item_row(self, item_id: int) -> None:
+        """Insert, update or remove the single Treeview row for this item."""
+        iid = f"item-{item_id}"
+        item = get_item_by_id(item_id)
+        if item is None:
+            self._snapshot.remove(item_id)
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+            self._forget_row(iid)
+            return
+
+        self._show_item_row(item, get_item_lookup_by_id(item.item_lookup_id))
+
+    def _show_item_row(self, item, item_lookup) -> None:
+        """Store a loaded item in the snapshot and show/update its row, or drop it if the filters hide it."""
+        iid = f"item-{item.item_id}"
+        row = self._store_item(item, item_lookup)
+        if not self._view_query(rows=[row]):
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+            self._forget_row(iid)
+            return
+        if self.sort_column is not None:
+            # The row may need to move; re-sorting the snapshot is cheap.
+            self._apply_view()
+            return
+        self._remember_row(row)
+        self._set_row(iid, self._row_values(row))
+
+    def _on_destroy(self, event=None) -> None:
+        if event is not None and event.widget is not self:
+            return
+        self._change_feed.stop()
+        self._scan_pipeline.stop()
+        self._scanner_devices.stop()
+        self._details_cache.stop()
+        self._scanner.remove_consumer(self._on_scanner_barcode)
+        if self._age_job is not None:
+            self.after_cancel(self._age_job)
+            self._age_job = None
 
     # ---------- Modes / scanning ----------
 
@@ -451,14 +774,87 @@ class PantryPage(ttk.Frame):
 
     def on_barcode_scanned(self, event=None) -> None:
         barcode = self.barcode_entry.get().strip()
-        if not barcode:
-            self.focus_barcode_entry()
-            return
+        if barcode:
+            self._enqueue_scan(barcode)
+        self.focus_barcode_entry()
+
+    def _on_scanner_barcode(self, barcode: str) -> None:
+        self._enqueue_scan(barcode.strip())
+
+    def _on_device_barcode(self, barcode: str, station: str) -> None:
+        # Called on a reader thread; hop to the Tk thread.
+        try:
+            self.after(0, self._enqueue_scan, barcode, station)
+        except Exception:
+            # Page destroyed while a reader was still running.
+            pass
 
-        if self.mode == "add":
-            ok = add_item(barcode)
-            if not ok:
-                unknown_dialog = UnknownBarcodeDialog(self.winfo_toplevel(), barcode, self.STYLE_CONFIG)
+    def _enqueue_scan(self, barcode: str, station: Optional[str] = None) -> None:
+        """Queue the DB write and bump the row right away (optimistic update)."""
+        job = self._scan_pipeline.submit(self.mode, barcode, station)
+        key = _barcode_key(barcode)
+        self._scan_pending[key] = self._scan_pending.get(key, 0) + job.delta
+
+        iid = self._tree_iid_by_barcode.get(key)
+        if iid is not None and iid in self._values_by_tree_iid:
+            name, location, _age, quantity = self._values_by_tree_iid[iid]
+            now = datetime.now()
+            self._last_scanned_by_tree_iid[iid] = now
+            self._schedule_age(iid, now, now)
+            self._set_row(iid, (name, location, "0s", Decimal(str(quantity)) + job.delta))
+            self.tree.see(iid)
+
+    def _on_scan_result(self, job, ok: bool, row: Optional[dict]) -> None:
+        """Reconcile the optimistic row with what the worker actually wrote (or roll it back)."""
+        key = _barcode_key(job.barcode)
+        remaining = self._scan_pending.get(key, 0) - job.delta
+        if remaining:
+            self._scan_pending[key] = remaining
+        else:
+            self._scan_pending.pop(key, None)
+
+        if job.error:
+            self.refresh_items()
+        elif row is not None:
+            item = SimpleNamespace(
+                item_id=row["item_id"],
+                item_lookup_id=row["item_lookup_id"],
+                quantity=row["quantity"],
+                storage_categories_id=row["storage_categories_id"],
+                last_scanned=row["last_scanned"],
+            )
+            item_lookup = SimpleNamespace(item_name=row["item_name"], barcode=row["barcode"])
+            self._show_item_row(item, item_lookup)
+        else:
+            iid = self._tree_iid_by_barcode.get(key)
+            if iid is not None and self.tree.exists(iid):
+                self.tree.delete(iid)
+                self._forget_row(iid)
+
+        if not ok and not job.error:
+            if job.mode == "add":
+                self._unknown_barcodes.append((job.barcode, job.catalog_product))
+                self._prompt_unknown_barcodes()
+            else:
+                where = f" (scanned at {job.station})" if job.station else ""
+                messagebox.showinfo("Not found", f"Item with barcode {job.barcode} is not in the pantry{where}.")
+                self.focus_barcode_entry()
+
+    def _prompt_unknown_barcodes(self) -> None:
+        # One dialog at a time; unknown scans arriving meanwhile wait their turn.
+        if self._prompting_unknown:
+            return
+        self._prompting_unknown = True
+        try:
+            while self._unknown_barcodes:
+                # The pipeline's resolver already checked the offline catalog (resolve_unknown_barcode).
+                barcode, product = self._unknown_barcodes.pop(0)
+                catalog_name = None
+                if product:
+                    catalog_name = " ".join(p for p in (product["brand"], product["name"]) if p)
+                unknown_dialog = UnknownBarcodeDialog(
+                    self.winfo_toplevel(), barcode, self.STYLE_CONFIG, catalog_name=catalog_name
+                )
                 self.wait_window(unknown_dialog)
                 if unknown_dialog.result:
                     add_window = AddItemWindow(
@@ -466,14 +862,35 @@ class PantryPage(ttk.Frame):
                         barcode,
                         self.refresh_items,
                         self.STYLE_CONFIG,
+                        prefill=product,
                     )
                     self.wait_window(add_window)
-        else:
-            ok = remove_item(barcode)
-            if not ok:
-                messagebox.showinfo("Not found", f"Item with barcode {barcode} is not in the pantry.")
+        finally:
+            self._prompting_unknown = False
+        self.focus_barcode_entry()
 
-        self.refresh_items()
+    def undo_last_change(self, event=None) -> None:
+        if not can_undo():
+            self.bell()
+            self.focus_barcode_entry()
+            return
+
+        conflicts = undo_conflicts()
+        if conflicts and not messagebox.askyesno(
+            "Undo",
+            "These items changed since the last action, possibly on another device:\n"
+            + "\n".join(conflicts)
+            + "\n\nUndo anyway and overwrite those changes?",
+        ):
+            self.focus_barcode_entry()
+            return
+
+        ok, result = undo_last(force=bool(conflicts))
+        if not ok:
+            messagebox.showerror("Undo failed", result)
+        else:
+            for item_id in result:
+                self._patch_item_row(item_id)
         self.focus_barcode_entry()
 
     # ---------- Tree click handling (location dropdown) ----------
@@ -534,7 +951,24 @@ class PantryPage(ttk.Frame):
         if not selected:
             return
         barcode = self._barcode_by_tree_iid.get(selected, selected)
-        ItemDetailsWindow(self.winfo_toplevel(), barcode, self.refresh_items, self.STYLE_CONFIG)
+        ItemDetailsWindow(
+            self.winfo_toplevel(),
+            barcode,
+            self.refresh_items,
+            self.STYLE_CONFIG,
+            details_cache=self._details_cache,
+        )
+
+    def _on_tree_hover(self, event) -> None:
+        iid = self.tree.identify_row(event.y)
+        if iid != self._hovered_iid:
+            self._hovered_iid = iid
+            self._prefetch_details(iid)
+
+    def _prefetch_details(self, iid: str) -> None:
+        barcode = self._barcode_by_tree_iid.get(iid)
+        if barcode:
+            self._details_cache.prefetch(barcode)
 
     def open_categories_window(self) -> None:
         CategoriesWindow(self.winfo_toplevel(), self.refresh_items, self.STYLE_CONFIG)
@@ -545,12 +979,42 @@ class PantryPage(ttk.Frame):
             self.current_category_filter_id,
             self._update_filter,
             self.STYLE_CONFIG,
+            current_text=self.filter_text,
+            current_age=self.age_filter,
         )
 
-    def _update_filter(self, new_filter_id, new_filter_name) -> None:
+    def open_stocktake_window(self) -> None:
+        stocktake = StocktakeWindow(
+            self.winfo_toplevel(),
+            self.current_category_filter_id,
+            self.refresh_items,
+            self.STYLE_CONFIG,
+        )
+        self.wait_window(stocktake)
+        self.focus_barcode_entry()
+
+    def _update_filter(self, new_filter_id, new_filter_name, text="", age_filter=AGE_FILTERS[0][0]) -> None:
         self.current_category_filter_id = new_filter_id
-        self.filter_label.config(text=f"Filter: {new_filter_name}")
-        self.refresh_items()
+        self.filter_text = text.strip()
+        self.age_filter = age_filter
+        label = f"Filter: {new_filter_name}"
+        if self.filter_text:
+            label += f' \u00b7 "{self.filter_text}"'
+        if age_filter != AGE_FILTERS[0][0]:
+            label += f" \u00b7 {age_filter}"
+        self.filter_label.config(text=label)
+        self._apply_view()
+
+    def sort_by_column(self, column: str) -> None:
+        """Header click: sort by that column, or flip the direction if it already is."""
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = column, False
+        for name, text in self.HEADINGS.items():
+            arrow = (" \u25bc" if self.sort_descending else " \u25b2") if name == column else ""
+            self.tree.heading(name, text=text + arrow)
+        self._apply_view()
 
 
 class PantryApp(tk.Tk):
@@ -2,22 +2,48 @@ from models.item import Item
 from models.item_lookup import ItemLookup
 from models.quantity import Quantity
 from models.storage_categories import StorageCategory
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text
+from models.pantry_journal import PantryJournal
+from models.barcode_lookup_miss import BarcodeLookupMiss
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import event, func, inspect, text
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from database import engine
-from datetime import datetime
+from database import engine, get_catalog_connection
+import http_client
+from .barcode_index import NAME_INDEX, get_barcode_index
+from .barcode_filters import get_catalog_filter, is_restricted_barcode
+from collections import deque
+from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
 import json
-from urllib.request import urlopen
-from urllib.parse import urlencode
+import socket
+import sqlite3
+import threading
 
 Session = sessionmaker(bind=engine)
-session = Session()
+# Thread-local sessions: the scan pipeline writes from a worker thread while the
+# Tk thread keeps reading; each thread transparently gets its own session.
+session = scoped_session(Session)
 _item_tracking_ready = False
 _item_lookup_optional_ready = False
 _item_lookup_qty_is_numeric = None
 
+# Undo journal: ring buffer of the most recent pantry mutations on this kiosk.
+JOURNAL_SIZE = 50
+_journal_station = socket.gethostname()[:100]
+_journal_entries = deque(maxlen=JOURNAL_SIZE)
+_journal_lock = threading.RLock()
+_journal_loaded = False
+_journal_persisted = None
+
+# Barcodes online lookups came back empty for (barcode -> checked_at).
+UPCITEMDB_SOURCE = "upcitemdb"
+# A scan is waiting on this lookup: fail fast (no retries) rather than back off.
+UPCITEMDB_TIMEOUT = (2, 3)  # seconds: (connect, read)
+MISS_RETRY_DAYS = 30
+_misses = None
+_misses_lock = threading.Lock()
+_misses_persisted = None
+
 
 # --- Internal helpers ---
 
@@ -168,17 +194,19 @@ def add_item(barcode):
 
     item = session.query(Item).where(Item.item_lookup_id == item_lookup.item_lookup_id).first()
     if item:
+        _journal("add", [_item_image(item)])
         item.quantity += 1
         item.last_scanned = datetime.now()
     else:
-        session.add(
-            Item(
-                item_lookup_id=item_lookup.item_lookup_id,
-                quantity=1,
-                last_scanned=datetime.now(),
-            )
+        item = Item(
+            item_lookup_id=item_lookup.item_lookup_id,
+            quantity=1,
+            last_scanned=datetime.now(),
         )
+        session.add(item)
+        _journal("add", [], created=[item])
 
+    _evaluate_refill([item_lookup.item_lookup_id], [item.storage_categories_id])
     session.commit()
     return True
 
@@ -197,12 +225,14 @@ def remove_item(barcode, quantity=1):
     if not item:
         return False
 
+    _journal("remove", [_item_image(item)])
     if item.quantity > quantity:
         item.quantity -= quantity
         item.last_scanned = datetime.now()
     else:
         session.delete(item)
 
+    _evaluate_refill([item_lookup.item_lookup_id], [item.storage_categories_id])
     session.commit()
     return True
 
@@ -220,23 +250,75 @@ def delete_item(barcode):
     if not item:
         return False
 
+    _journal("delete", [_item_image(item)])
     session.delete(item)
+    _evaluate_refill([item_lookup.item_lookup_id], [item.storage_categories_id])
     session.commit()
     return True
 
 
 def get_all_items(category_id=None):
     _ensure_item_tracking_columns()
-    q = session.query(Item)
+    # populate_existing: rows written by another thread's session must not come back stale.
+    q = session.query(Item).populate_existing()
     if category_id is not None:
         q = q.where(Item.storage_categories_id == category_id)
     return q.all()
 
 
+def get_item_by_id(item_id):
+    return session.query(Item).populate_existing().where(Item.item_id == item_id).first()
+
+
+def get_pantry_row(barcode):
+    """
+    Fresh, detached snapshot of the pantry row for a barcode, safe to hand to another thread.
+    Returns a dict (item_id, item_lookup_id, item_name, barcode, quantity,
+    storage_categories_id, last_scanned) or None if the barcode is not in the pantry.
+    """
+    item_lookup = _get_item_lookup_by_barcode(barcode)
+    if not item_lookup:
+        return None
+    item = (
+        session.query(Item)
+        .populate_existing()
+        .where(Item.item_lookup_id == item_lookup.item_lookup_id)
+        .first()
+    )
+    if not item:
+        return None
+    return {
+        "item_id": item.item_id,
+        "item_lookup_id": item.item_lookup_id,
+        "item_name": item_lookup.item_name,
+        "barcode": item_lookup.barcode,
+        "quantity": item.quantity,
+        "storage_categories_id": item.storage_categories_id,
+        "last_scanned": item.last_scanned,
+    }
+
+
 def get_item_lookup_by_id(item_lookup_id):
     return session.query(ItemLookup).where(ItemLookup.item_lookup_id == item_lookup_id).first()
 
 
+def get_item_lookups_by_ids(item_lookup_ids):
+    """Batch fetch: returns {item_lookup_id: ItemLookup} in one query."""
+    ids = [i for i in set(item_lookup_ids) if i is not None]
+    if not ids:
+        return {}
+    rows = session.query(ItemLookup).where(ItemLookup.item_lookup_id.in_(ids)).all()
+    return {row.item_lookup_id: row for row in rows}
+
+
+def expire_cached_rows():
+    """
+    Drop cached ORM state so the next reads see rows another device changed.
+    Call before applying change-feed notifications.
+    """
+    session.expire_all()
+
+
 def get_product_details(barcode):
     """
     Product details for ItemDetailsWindow from PostgreSQL schema provided.
@@ -288,6 +370,7 @@ def get_product_details(barcode):
         "sugars_100g": extra.get("sugars_100g"),
         "proteins_100g": extra.get("proteins_100g"),
         "salt_100g": extra.get("salt_100g"),
+        "min_stock": item_lookup.min_stock,
     }
 
 
@@ -395,6 +478,146 @@ def add_manual_lookup_and_item(barcode, product_data):
     return True, None
 
 
+# --- Product suggestions (AddItemWindow autocomplete) ---
+
+SUGGESTION_LIMIT = 8
+SUGGESTION_MIN_PREFIX = 2
+_SUGGESTION_FIELDS = (
+    "description", "brand", "quantity", "categories", "energy_kcal_100g", "fat_100g",
+    "saturated_fat_100g", "carbs_100g", "sugars_100g", "proteins_100g", "salt_100g",
+)
+_catalog_index_ready = None
+
+
+def _has_catalog_name_index(conn):
+    """
+    Whether the slim DB carries the NOCASE name index (built by
+    `python -m pantryapp.barcode_index`). Without it the prefix query would
+    scan the whole products table, so catalog suggestions are skipped.
+    """
+    global _catalog_index_ready
+    if _catalog_index_ready is None:
+        _catalog_index_ready = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (NAME_INDEX,)
+        ).fetchone() is not None
+        if not _catalog_index_ready:
+            print(f"{NAME_INDEX} missing; run `python -m pantryapp.barcode_index` for catalog suggestions")
+    return _catalog_index_ready
+
+
+def _lookup_suggestions(prefix, limit):
+    # Served by item_lookup_name_prefix_idx (lower(item_name) COLLATE "C"); index order, so LIMIT stops early.
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                f"""
+                SELECT item_name AS name, {", ".join(_SUGGESTION_FIELDS)}
+                FROM item_lookup
+                WHERE lower(item_name) COLLATE "C" LIKE :pattern
+                ORDER BY lower(item_name) COLLATE "C"
+                LIMIT :limit
+                """
+            ),
+            {"pattern": escaped + "%", "limit": limit},
+        ).mappings().all()
+    return [dict(row, source="pantry") for row in rows]
+
+
+def _catalog_suggestions(prefix, limit):
+    conn = get_catalog_connection()
+    if conn is None:
+        return []
+    try:
+        if not _has_catalog_name_index(conn):
+            return []
+        # Range scan on the NOCASE index; U+10FFFF sorts after anything that can follow the prefix.
+        rows = conn.execute(
+            """
+            SELECT name, brand, quantity
+            FROM products
+            WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE
+            ORDER BY name COLLATE NOCASE
+            LIMIT ?
+            """,
+            (prefix, prefix + "\U0010ffff", limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        {"name": name, "brand": brand, "quantity": quantity, "source": "catalog"}
+        for name, brand, quantity in rows
+        if name
+    ]
+
+
+def search_product_suggestions(prefix, limit=SUGGESTION_LIMIT):
+    """
+    Name-prefix suggestions for AddItemWindow: known item_lookup rows first (full
+    metadata), then the OpenFoodFacts slim DB. Returns dicts keyed like the
+    AddItemWindow fields, plus "source". Safe to call from a worker thread.
+    """
+    prefix = str(prefix or "").strip().lower()
+    if len(prefix) < SUGGESTION_MIN_PREFIX:
+        return []
+
+    suggestions = []
+    try:
+        suggestions.extend(_lookup_suggestions(prefix, limit))
+    except SQLAlchemyError as e:
+        print(f"Item lookup suggestions failed: {e}")
+    if len(suggestions) < limit:
+        try:
+            suggestions.extend(_catalog_suggestions(prefix, limit))
+        except sqlite3.Error as e:
+            print(f"Catalog suggestions failed: {e}")
+
+    unique = []
+    seen = set()
+    for suggestion in suggestions:
+        key = (str(suggestion["name"]).strip().lower(), str(suggestion.get("brand") or "").strip().lower())
+        if key not in seen:
+            seen.add(key)
+            unique.append(suggestion)
+    return unique[:limit]
+
+
+# --- Offline catalog lookups ---
+
+def _catalog_product_from_sqlite(barcode):
+    conn = get_catalog_connection()
+    if conn is None:
+        return None
+    try:
+        candidates = _barcode_candidates(barcode)
+        candidates += ["0" + c for c in candidates if c.isdigit()]
+        placeholders = ", ".join("?" for _ in candidates)
+        return conn.execute(
+            f"SELECT name, brand, quantity FROM products WHERE code IN ({placeholders}) LIMIT 1",
+            candidates,
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Catalog lookup failed: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def lookup_catalog_product(barcode):
+    """
+    Name/brand/quantity for a barcode from the offline OpenFoodFacts catalog, or None.
+    Uses the memory-mapped barcode index when it has been built; otherwise probes SQLite.
+    """
+    if not _barcode_candidates(barcode):
+        return None
+    index = get_barcode_index()
+    entry = index.get(barcode) if index is not None else _catalog_product_from_sqlite(barcode)
+    if not entry:
+        return None
+    name, brand, quantity = entry
+    return {"name": name, "brand": brand, "quantity": quantity}
+
+
 def get_all_storage_categories():
     cats = session.query(StorageCategory).order_by(StorageCategory.storage_category_name.asc()).all()
     return [(c.storage_categories_id, c.storage_category_name) for c in cats]
@@ -434,35 +657,634 @@ def assign_item_to_category(barcode, category_id):
     if not items:
         return False
 
+    _journal("assign", [_item_image(item) for item in items])
+    touched_categories = {item.storage_categories_id for item in items}
+    touched_categories.add(category_id)
     for item in items:
         item.storage_categories_id = category_id
         item.last_scanned = datetime.now()
 
+    _evaluate_refill([], touched_categories)
     session.commit()
     return True
 
 
+# --- Undo journal ---
+# Every pantry mutation records the before-image of the item rows it touches,
+# plus their after-image at commit time. Entries live in an in-memory ring
+# buffer (newest last, O(1) pop) mirrored to the pantry_journal table so a
+# restart keeps the recent history for this kiosk. Undo compares each row with
+# its after-image first, so a change made since (e.g. on another device via the
+# change feed) is never silently overwritten.
+
+def _item_image(item):
+    return (
+        item.item_id,
+        {
+            "item_lookup_id": item.item_lookup_id,
+            "quantity": str(item.quantity),
+            "storage_categories_id": item.storage_categories_id,
+            "last_scanned": item.last_scanned.isoformat() if item.last_scanned else None,
+        },
+    )
+
+
+def _images_match(current, expected):
+    """True if two item images (or None for "no row") describe the same row state."""
+    if current is None or expected is None:
+        return current is expected
+    return (
+        current["item_lookup_id"] == expected["item_lookup_id"]
+        and Decimal(current["quantity"]) == Decimal(expected["quantity"])
+        and current["storage_categories_id"] == expected["storage_categories_id"]
+        and current["last_scanned"] == expected["last_scanned"]
+    )
+
+
+def _restore_item_image(item, image):
+    item.item_lookup_id = image["item_lookup_id"]
+    item.quantity = Decimal(image["quantity"])
+    item.storage_categories_id = image["storage_categories_id"]
+    item.last_scanned = datetime.fromisoformat(image["last_scanned"]) if image["last_scanned"] else None
+
+
+def _is_journal_persisted():
+    global _journal_persisted
+    if _journal_persisted is None:
+        try:
+            _journal_persisted = inspect(engine).has_table("pantry_journal")
+        except SQLAlchemyError:
+            _journal_persisted = False
+    return _journal_persisted
+
+
+def _load_journal():
+    """Load this station's most recent journal entries once (no commit; safe mid-transaction)."""
+    global _journal_loaded
+    with _journal_lock:
+        if _journal_loaded:
+            return
+        _journal_loaded = True
+    if not _is_journal_persisted():
+        return
+
+    rows = (
+        session.query(PantryJournal)
+        .where(PantryJournal.station == _journal_station)
+        .order_by(PantryJournal.journal_id.desc())
+        .limit(JOURNAL_SIZE)
+        .all()
+    )
+    for row in reversed(rows):
+        _journal_entries.append(
+            {
+                "journal_id": row.journal_id,
+                "action": row.action,
+                "rows": json.loads(row.before_image),
+                "after": _after_from_json(row.after_image),
+            }
+        )
+    if len(rows) == JOURNAL_SIZE:
+        # Trim rows that fell out of the ring buffer; committed with the next change.
+        session.query(PantryJournal).where(
+            PantryJournal.station == _journal_station,
+            PantryJournal.journal_id < rows[-1].journal_id,
+        ).delete(synchronize_session=False)
+
+
+def _journal(action, images, created=()):
+    """
+    Record one undoable operation in the current transaction.
+    images: (item_id, before-image) pairs captured before the rows were changed.
+    created: new Item objects; undoing deletes them again.
+    The entry only reaches the in-memory buffer once the transaction commits.
+    """
+    _load_journal()
+    rows = list(images)
+    if created:
+        session.flush()
+        rows.extend((item.item_id, None) for item in created)
+
+    pending = session.info.setdefault("journal_pending", [])
+    entry = {"journal_id": None, "action": action, "rows": rows, "after": None}
+    if _is_journal_persisted():
+        # Ring buffer: entries about to fall off the in-memory deque go from the table too.
+        trimmed = session.info.setdefault("journal_trimmed", set())
+        with _journal_lock:
+            overflow = len(_journal_entries) + len(pending) + 1 - JOURNAL_SIZE
+            oldest_ids = [e["journal_id"] for e in list(_journal_entries)[:max(overflow, 0)]]
+        stale_ids = [i for i in oldest_ids if i is not None and i not in trimmed]
+        if stale_ids:
+            session.query(PantryJournal).where(PantryJournal.journal_id.in_(stale_ids)).delete(
+                synchronize_session=False
+            )
+            trimmed.update(stale_ids)
+        row = PantryJournal(
+            station=_journal_station,
+            action=action,
+            created_at=datetime.now(),
+            before_image=json.dumps(rows),
+        )
+        session.add(row)
+        session.flush()
+        entry["journal_id"] = row.journal_id
+    pending.append(entry)
+
+
+def _after_from_json(after_image):
+    if not after_image:
+        return None  # journaled before after-images were kept; undo can't check it
+    return {item_id: image for item_id, image in json.loads(after_image)}
+
+
+# Pending entries are kept per session (i.e. per thread) until that session commits.
+@event.listens_for(Session, "before_commit")
+def _capture_after_images(committing_session):
+    pending = committing_session.info.get("journal_pending")
+    if not pending:
+        return
+    committing_session.flush()
+    for entry in pending:
+        after = {}
+        for item_id, _before in entry["rows"]:
+            item = committing_session.get(Item, item_id)
+            after[item_id] = _item_image(item)[1] if item is not None else None
+        entry["after"] = after
+        if entry["journal_id"] is not None:
+            committing_session.query(PantryJournal).where(
+                PantryJournal.journal_id == entry["journal_id"]
+            ).update({"after_image": json.dumps(list(after.items()))}, synchronize_session=False)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(committed_session):
+    pending = committed_session.info.pop("journal_pending", [])
+    committed_session.info.pop("journal_trimmed", None)
+    with _journal_lock:
+        _journal_entries.extend(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(rolled_back_session):
+    rolled_back_session.info.pop("journal_pending", None)
+    rolled_back_session.info.pop("journal_trimmed", None)
+
+
+def can_undo():
+    _load_journal()
+    return bool(_journal_entries)
+
+
+def _undo_conflicts(entry):
+    """Names of items whose row no longer matches the entry's after-image."""
+    after = entry.get("after")
+    if after is None:
+        return []
+    names = []
+    for item_id, _before in entry["rows"]:
+        item = get_item_by_id(item_id)
+        current = _item_image(item)[1] if item is not None else None
+        if not _images_match(current, after.get(item_id)):
+            image = current or after.get(item_id)
+            item_lookup = get_item_lookup_by_id(image["item_lookup_id"]) if image else None
+            names.append(item_lookup.item_name if item_lookup else f"Item {item_id}")
+    return names
+
+
+def undo_conflicts():
+    """
+    Items the newest journal entry touched that have changed since (e.g. on
+    another device). Undoing it would overwrite those changes; empty if safe.
+    """
+    _load_journal()
+    with _journal_lock:
+        entry = _journal_entries[-1] if _journal_entries else None
+    if entry is None:
+        return []
+    return _undo_conflicts(entry)
+
+
+def undo_last(force=False):
+    """
+    Revert the newest journaled pantry operation in one transaction, restoring
+    each touched item row to its exact prior state. Unless force is set, the
+    undo is refused if any of those rows changed after the operation.
+    Returns (True, set of affected item_ids) or (False, error message).
+    """
+    _load_journal()
+    with _journal_lock:
+        entry = _journal_entries.pop() if _journal_entries else None
+    if entry is None:
+        return False, "Nothing to undo."
+
+    touched_items = set()
+    touched_lookups = set()
+    touched_categories = set()
+    try:
+        conflicts = [] if force else _undo_conflicts(entry)
+        if conflicts:
+            with _journal_lock:
+                _journal_entries.append(entry)
+            return False, (
+                "These items changed since, possibly on another device:\n"
+                + "\n".join(conflicts)
+                + "\n\nNothing was undone."
+            )
+
+        for item_id, image in reversed(entry["rows"]):
+            item = get_item_by_id(item_id)
+            if item is not None:
+                touched_lookups.add(item.item_lookup_id)
+                touched_categories.add(item.storage_categories_id)
+
+            if image is None:
+                if item is not None:
+                    session.delete(item)
+            else:
+                if item is None:
+                    item = Item(item_id=item_id)
+                    session.add(item)
+                _restore_item_image(item, image)
+                touched_lookups.add(item.item_lookup_id)
+                touched_categories.add(item.storage_categories_id)
+            session.flush()
+            touched_items.add(item_id)
+
+        if entry["journal_id"] is not None:
+            session.query(PantryJournal).where(PantryJournal.journal_id == entry["journal_id"]).delete(
+                synchronize_session=False
+            )
+
+        _evaluate_refill(touched_lookups, touched_categories)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        with _journal_lock:
+            _journal_entries.append(entry)
+        print(f"Failed to undo pantry change: {e}")
+        return False, "Could not undo the last change. Nothing was modified."
+
+    return True, touched_items
+
+
+# --- Stocktake reconciliation ---
+
+def plan_stocktake(category_id, scanned_counts):
+    """
+    Reconcile a whole-location scan against that location's item rows.
+    scanned_counts maps barcode -> counted quantity (category_id None means
+    items with no location). Returns (plan, unknown_barcodes) where plan is a
+    list of dicts with keys: action ("add", "move", "set", "remove"),
+    item_id, item_lookup_id, name, old_quantity, new_quantity.
+    Nothing is written; pass the plan to apply_stocktake.
+    """
+    _ensure_item_tracking_columns()
+
+    counted = {}
+    unknown = []
+    for barcode, count in (scanned_counts or {}).items():
+        item_lookup = _get_item_lookup_by_barcode(barcode)
+        if not item_lookup:
+            unknown.append(barcode)
+            continue
+        entry = counted.setdefault(item_lookup.item_lookup_id, [item_lookup, 0])
+        entry[1] += count
+
+    on_shelf = {item.item_lookup_id: item for item in _get_items_in_location(category_id)}
+
+    plan = []
+    for item_lookup_id, (item_lookup, count) in counted.items():
+        item = on_shelf.get(item_lookup_id)
+        if item is not None:
+            if item.quantity != count:
+                plan.append(_stocktake_step("set", item, item_lookup, item.quantity, count))
+            continue
+
+        elsewhere = session.query(Item).where(Item.item_lookup_id == item_lookup_id).first()
+        if elsewhere is not None:
+            plan.append(_stocktake_step("move", elsewhere, item_lookup, elsewhere.quantity, count))
+        else:
+            plan.append(_stocktake_step("add", None, item_lookup, 0, count))
+
+    for item_lookup_id in on_shelf.keys() - counted.keys():
+        item = on_shelf[item_lookup_id]
+        plan.append(_stocktake_step("remove", item, get_item_lookup_by_id(item_lookup_id), item.quantity, 0))
+
+    plan.sort(key=lambda step: (step["action"], step["name"].lower()))
+    return plan, unknown
+
+
+def _get_items_in_location(category_id):
+    """Item rows stored in one location; None means items with no location (not every item)."""
+    q = session.query(Item).populate_existing()
+    if category_id is None:
+        return q.where(Item.storage_categories_id.is_(None)).all()
+    return q.where(Item.storage_categories_id == category_id).all()
+
+
+def _stocktake_step(action, item, item_lookup, old_quantity, new_quantity):
+    return {
+        "action": action,
+        "item_id": item.item_id if item is not None else None,
+        "item_lookup_id": item_lookup.item_lookup_id if item_lookup else item.item_lookup_id,
+        "name": item_lookup.item_name if item_lookup else "Unknown Item",
+        "old_quantity": old_quantity,
+        "new_quantity": new_quantity,
+    }
+
+
+def apply_stocktake(category_id, plan):
+    """
+    Apply a plan from plan_stocktake in a single transaction.
+    Returns (True, None) on success or (False, error message).
+    """
+    now = datetime.now()
+    touched_lookups = set()
+    touched_categories = {category_id}
+
+    changed = []
+    created = []
+
+    try:
+        for step in plan:
+            touched_lookups.add(step["item_lookup_id"])
+            if step["action"] == "add":
+                item = Item(
+                    item_lookup_id=step["item_lookup_id"],
+                    quantity=step["new_quantity"],
+                    storage_categories_id=category_id,
+                    last_scanned=now,
+                )
+                session.add(item)
+                created.append(item)
+                continue
+
+            item = session.query(Item).where(Item.item_id == step["item_id"]).first()
+            if item is None:
+                raise ValueError(f"{step['name']} changed while the stocktake was open.")
+            changed.append(_item_image(item))
+
+            if step["action"] == "remove":
+                if item.storage_categories_id != category_id:
+                    raise ValueError(f"{step['name']} was moved while the stocktake was open.")
+                session.delete(item)
+            else:
+                touched_categories.add(item.storage_categories_id)
+                item.quantity = step["new_quantity"]
+                item.storage_categories_id = category_id
+                item.last_scanned = now
+
+        _journal("stocktake", changed, created=created)
+        _evaluate_refill(touched_lookups, touched_categories)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"Failed to apply stocktake: {e}")
+        return False, "Could not apply the stocktake. No changes were saved."
+
+    return True, None
+
+
+# --- Refill evaluation ---
+# need_refill flags are kept current incrementally: every pantry mutation
+# re-evaluates only the product(s) and location(s) it touched, inside the same
+# transaction, so readers never need a full-table recompute.
+
+def _evaluate_refill(item_lookup_ids, category_ids):
+    """
+    Recompute need_refill for the given item_lookup rows and storage categories.
+    A product needs a refill when its total on-hand quantity is below its
+    min_stock; a location needs one when the quantity stored there is below
+    the location's min_stock. Rows without a threshold are never flagged.
+    Caller is responsible for committing.
+    """
+    session.flush()
+
+    for item_lookup_id in {i for i in item_lookup_ids if i is not None}:
+        item_lookup = get_item_lookup_by_id(item_lookup_id)
+        if not item_lookup:
+            continue
+        if item_lookup.min_stock is None:
+            item_lookup.need_refill = False
+            continue
+        on_hand = (
+            session.query(func.coalesce(func.sum(Item.quantity), 0))
+            .where(Item.item_lookup_id == item_lookup_id)
+            .scalar()
+        )
+        item_lookup.need_refill = on_hand < item_lookup.min_stock
+
+    for category_id in {c for c in category_ids if c is not None}:
+        cat = session.query(StorageCategory).where(StorageCategory.storage_categories_id == category_id).first()
+        if not cat:
+            continue
+        if cat.min_stock is None:
+            cat.need_refill = False
+            continue
+        on_hand = (
+            session.query(func.coalesce(func.sum(Item.quantity), 0))
+            .where(Item.storage_categories_id == category_id)
+            .scalar()
+        )
+        cat.need_refill = on_hand < cat.min_stock
+
+
+def set_item_min_stock(barcode, min_stock):
+    """
+    Set (or clear with None) the minimum on-hand quantity for a product.
+    Returns True on success; False if barcode is unknown.
+    """
+    item_lookup = _get_item_lookup_by_barcode(barcode)
+    if not item_lookup:
+        return False
+
+    item_lookup.min_stock = _to_decimal_or_none(min_stock)
+    _evaluate_refill([item_lookup.item_lookup_id], [])
+    session.commit()
+    return True
+
+
+def set_category_min_stock(category_id, min_stock):
+    """
+    Set (or clear with None) the minimum total quantity for a storage location.
+    Returns True on success; False if the category does not exist.
+    """
+    cat = session.query(StorageCategory).where(StorageCategory.storage_categories_id == category_id).first()
+    if not cat:
+        return False
+
+    cat.min_stock = _to_decimal_or_none(min_stock)
+    _evaluate_refill([], [category_id])
+    session.commit()
+    return True
+
+
+def get_refill_alerts():
+    """
+    Products and locations currently flagged need_refill, for dashboard alerts.
+    Only flagged rows are read; flags themselves are maintained by _evaluate_refill.
+    Rows without a min_stock are skipped even if flagged (e.g. seeded flags that
+    predate thresholds and haven't been re-evaluated yet).
+    Returns a list of dicts with keys: kind ("item" or "location"), name, on_hand, min_stock.
+    """
+    alerts = []
+
+    low_lookups = (
+        session.query(ItemLookup, func.coalesce(func.sum(Item.quantity), 0))
+        .outerjoin(Item, Item.item_lookup_id == ItemLookup.item_lookup_id)
+        .where(ItemLookup.need_refill.is_(True))
+        .where(ItemLookup.min_stock.is_not(None))
+        .group_by(ItemLookup.item_lookup_id)
+        .order_by(ItemLookup.item_name.asc())
+        .all()
+    )
+    for item_lookup, on_hand in low_lookups:
+        alerts.append(
+            {
+                "kind": "item",
+                "name": item_lookup.item_name,
+                "on_hand": on_hand,
+                "min_stock": item_lookup.min_stock,
+            }
+        )
+
+    low_cats = (
+        session.query(StorageCategory, func.coalesce(func.sum(Item.quantity), 0))
+        .outerjoin(Item, Item.storage_categories_id == StorageCategory.storage_categories_id)
+        .where(StorageCategory.need_refill.is_(True))
+        .where(StorageCategory.min_stock.is_not(None))
+        .group_by(StorageCategory.storage_categories_id)
+        .order_by(StorageCategory.storage_category_name.asc())
+        .all()
+    )
+    for cat, on_hand in low_cats:
+        alerts.append(
+            {
+                "kind": "location",
+                "name": cat.storage_category_name,
+                "on_hand": on_hand,
+                "min_stock": cat.min_stock,
+            }
+        )
+
+    return alerts
+
+
+# --- Unknown barcode resolution ---
+
+def _is_miss_store_persisted():
+    global _misses_persisted
+    if _misses_persisted is None:
+        try:
+            _misses_persisted = inspect(engine).has_table("barcode_lookup_miss")
+        except SQLAlchemyError:
+            _misses_persisted = False
+    return _misses_persisted
+
+
+def _load_misses():
+    """Barcode -> last empty online lookup, loaded once (the table only grows by a few rows a day)."""
+    global _misses
+    with _misses_lock:
+        if _misses is None:
+            misses = {}
+            if _is_miss_store_persisted():
+                try:
+                    for row in session.query(BarcodeLookupMiss).all():
+                        misses[row.barcode] = row.checked_at
+                except SQLAlchemyError as e:
+                    print(f"Could not load barcode lookup misses: {e}")
+                    session.rollback()
+            _misses = misses
+        return _misses
+
+
+def _is_known_miss(barcode):
+    misses = _load_misses()
+    cutoff = datetime.now() - timedelta(days=MISS_RETRY_DAYS)
+    for candidate in _barcode_candidates(barcode):
+        checked_at = misses.get(candidate)
+        if checked_at is not None and checked_at > cutoff:
+            return True
+    return False
+
+
+def _record_miss(barcode, source):
+    barcode_text = str(barcode).strip()
+    checked_at = datetime.now()
+    _load_misses()[barcode_text] = checked_at
+    if not _is_miss_store_persisted():
+        return
+    try:
+        session.merge(BarcodeLookupMiss(barcode=barcode_text, source=source, checked_at=checked_at))
+        session.commit()
+    except SQLAlchemyError as e:
+        print(f"Could not record barcode lookup miss: {e}")
+        session.rollback()
+
+
+def resolve_unknown_barcode(barcode):
+    """
+    Decide what to do with a barcode that has no item_lookup row, cheapest check first,
+    so the (up to 5 s, single-attempt) UPCItemDB call only happens when it can plausibly succeed.
+    Returns (outcome, product):
+      ("catalog", product) - the offline catalog knows it; prefill manual entry from product
+      ("created", None)    - UPCItemDB knew it and an item_lookup row was added
+      ("manual", None)     - restricted/in-store code, a recent known miss, or nothing found
+    """
+    if is_restricted_barcode(barcode):
+        return "manual", None
+
+    # The Bloom filter rules out most non-catalog codes without touching the index or SQLite.
+    catalog_filter = get_catalog_filter()
+    if catalog_filter is None or barcode in catalog_filter:
+        product = lookup_catalog_product(barcode)
+        if product:
+            return "catalog", product
+
+    if _is_known_miss(barcode):
+        return "manual", None
+    if get_new_item_lookup_from_api(barcode) is not None:
+        return "created", None
+    return "manual", None
+
+
+def _fetch_upcitemdb_item(barcode):
+    """First UPCItemDB match for a barcode, or None when it has none. Network errors raise."""
+    response = http_client.get(
+        "https://api.upcitemdb.com/prod/trial/lookup",
+        params={"upc": barcode},
+        endpoint="upcitemdb lookup",
+        timeout=UPCITEMDB_TIMEOUT,
+        retries=0,
+    )
+    response.raise_for_status()
+    data = response.json()
+    if data.get("code") == "OK" and data.get("total", 0) > 0:
+        return data["items"][0]
+    return None
+
+
 def get_new_item_lookup_from_api(barcode):
     """
     Fetch item details from UPCItemDB API using the given barcode.
     Creates a new item_lookup record if found, or returns None if not found/error.
+    Empty answers are remembered so the barcode isn't looked up again for a while.
     """
-    url = "https://api.upcitemdb.com/prod/trial/lookup?" + urlencode({"upc": barcode})
     try:
-        with urlopen(url, timeout=5) as response:
-            data = json.loads(response.read().decode())
-        if data.get("code") == "OK" and data.get("total", 0) > 0:
-            item = data["items"][0]
-            new_lookup = ItemLookup(
-                barcode=int(str(barcode).strip()) if str(barcode).strip().isdigit() else None,
-                item_name=item.get("title"),
-                description=item.get("description"),
-                quantity_id=1,
-            )
-            session.add(new_lookup)
-            session.commit()
-            return new_lookup
-        return None
+        item = _fetch_upcitemdb_item(barcode)
+        if item is None:
+            _record_miss(barcode, UPCITEMDB_SOURCE)
+            return None
+        new_lookup = ItemLookup(
+            barcode=int(str(barcode).strip()) if str(barcode).strip().isdigit() else None,
+            item_name=item.get("title"),
+            description=item.get("description"),
+            quantity_id=1,
+        )
+        session.add(new_lookup)
+        session.commit()
+        return new_lookup
     except Exception as e:
         print(f"API error: {e}")
         return None
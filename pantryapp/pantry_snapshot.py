@@ -0,0 +1,158 @@
+"""pantry_snapshot.py
+
+In-memory, column-oriented copy of the pantry list for the pantry page.
+
+The page loads every item once and keeps it here; changing the location,
+text or age filter, or clicking a column header to sort, is then computed
+locally from these parallel columns without another DB query. Rows are
+patched in place as scans and change-feed updates arrive.
+
+Each column is a flat list/array indexed by row number, with item_id -> row
+kept in a dict; removal swaps the last row into the hole so every column
+stays dense.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+from typing import Optional
+
+# (label, minimum age in seconds, maximum age in seconds)
+AGE_FILTERS = (
+    ("Any age", None, None),
+    ("Scanned today (24h)", None, 24 * 3600),
+    ("Scanned this week", None, 7 * 24 * 3600),
+    ("Older than 30 days", 30 * 24 * 3600, None),
+    ("Older than 90 days", 90 * 24 * 3600, None),
+)
+
+ALL_LOCATIONS = object()
+
+_NO_SCAN = float("-inf")
+
+
+class PantrySnapshot:
+    """Parallel columns: item_id, name, barcode, lookup id, location id, quantity, last scan time."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.item_ids = array("q")
+        self.names: list[str] = []
+        self.names_folded: list[str] = []
+        self.barcodes: list[str] = []
+        self.lookup_ids: list[Optional[int]] = []
+        self.cat_ids: list[Optional[int]] = []
+        self.quantities: list = []  # as loaded (Decimal), for display
+        self.quantity_keys = array("d")  # float copy for sorting
+        self.scanned_at = array("d")  # POSIX timestamps; -inf when never scanned
+        self._row_by_item_id: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._row_by_item_id
+
+    def upsert(self, item_id, name, barcode, lookup_id, cat_id, quantity, last_scanned) -> None:
+        name = name or "Unknown Item"
+        scanned = last_scanned.timestamp() if isinstance(last_scanned, datetime) else _NO_SCAN
+        row = self._row_by_item_id.get(item_id)
+        if row is None:
+            self._row_by_item_id[item_id] = len(self.item_ids)
+            self.item_ids.append(item_id)
+            self.names.append(name)
+            self.names_folded.append(name.casefold())
+            self.barcodes.append(barcode or "")
+            self.lookup_ids.append(lookup_id)
+            self.cat_ids.append(cat_id)
+            self.quantities.append(quantity if quantity is not None else 0)
+            self.quantity_keys.append(float(quantity or 0))
+            self.scanned_at.append(scanned)
+            return
+        self.names[row] = name
+        self.names_folded[row] = name.casefold()
+        self.barcodes[row] = barcode or ""
+        self.lookup_ids[row] = lookup_id
+        self.cat_ids[row] = cat_id
+        self.quantities[row] = quantity if quantity is not None else 0
+        self.quantity_keys[row] = float(quantity or 0)
+        self.scanned_at[row] = scanned
+
+    def remove(self, item_id) -> None:
+        row = self._row_by_item_id.pop(item_id, None)
+        if row is None:
+            return
+        last = len(self.item_ids) - 1
+        if row != last:
+            moved_id = self.item_ids[last]
+            for column in self._columns():
+                column[row] = column[last]
+            self._row_by_item_id[moved_id] = row
+        for column in self._columns():
+            column.pop()
+
+    def _columns(self):
+        return (
+            self.item_ids, self.names, self.names_folded, self.barcodes,
+            self.lookup_ids, self.cat_ids, self.quantities, self.quantity_keys, self.scanned_at,
+        )
+
+    def row_of(self, item_id) -> Optional[int]:
+        return self._row_by_item_id.get(item_id)
+
+    def last_scanned(self, row: int) -> Optional[datetime]:
+        scanned = self.scanned_at[row]
+        return None if scanned == _NO_SCAN else datetime.fromtimestamp(scanned)
+
+    def query(
+        self,
+        category_id=ALL_LOCATIONS,
+        text: str = "",
+        min_age: Optional[float] = None,
+        max_age: Optional[float] = None,
+        sort_column: Optional[str] = None,
+        descending: bool = False,
+        location_names: Optional[dict] = None,
+        now: Optional[float] = None,
+        rows=None,
+    ) -> list[int]:
+        """
+        Row numbers that pass every filter, in display order (snapshot order when unsorted).
+        Pass `rows` to test just those rows.
+        """
+        rows = range(len(self.item_ids)) if rows is None else rows
+
+        if category_id is not ALL_LOCATIONS:
+            cat_ids = self.cat_ids
+            rows = [r for r in rows if cat_ids[r] == category_id]
+
+        needle = text.strip().casefold()
+        if needle:
+            names, barcodes = self.names_folded, self.barcodes
+            rows = [r for r in rows if needle in names[r] or needle in barcodes[r]]
+
+        if min_age is not None or max_age is not None:
+            now = datetime.now().timestamp() if now is None else now
+            scanned = self.scanned_at
+            # Age limits become scan-time limits so the loop is a single float compare.
+            newest = now - min_age if min_age is not None else float("inf")
+            oldest = now - max_age if max_age is not None else _NO_SCAN
+            rows = [r for r in rows if oldest <= scanned[r] <= newest]
+
+        rows = list(rows)
+        if sort_column == "name":
+            rows.sort(key=self.names_folded.__getitem__, reverse=descending)
+        elif sort_column == "quantity":
+            rows.sort(key=self.quantity_keys.__getitem__, reverse=descending)
+        elif sort_column == "age":
+            # Youngest first: the most recent scan time sorts first.
+            rows.sort(key=self.scanned_at.__getitem__, reverse=not descending)
+        elif sort_column == "location":
+            folded = {cid: name.casefold() for cid, name in (location_names or {}).items()}
+            cat_ids = self.cat_ids
+            # Rows without a location go last.
+            rows.sort(key=lambda r: (cat_ids[r] is None, folded.get(cat_ids[r], "")), reverse=descending)
+        return rows
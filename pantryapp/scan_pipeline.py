@@ -0,0 +1,154 @@
+"""scan_pipeline.py
+
+Non-blocking scan pipeline for the pantry page.
+
+Scans are queued immediately on the Tk thread and written to the DB by a
+single worker thread, in scan order. When a write finishes, the result and a
+fresh snapshot of the affected row are handed back to the Tk thread via
+`after(0, ...)`, so the page can reconcile (or roll back) its optimistic row.
+
+An add for an unknown barcode may need a UPCItemDB call, so it is handed to a
+separate resolver worker instead of holding up the writes queued behind it.
+Until that lookup finishes, every later scan of the same barcode (adds and
+removes alike) is parked behind it. The resolver then queues a resume marker,
+and the write worker runs the parked jobs in scan order, so a scan never
+overtakes the pending lookup for its barcode.
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .pantry_model import add_item, remove_item, get_pantry_row, resolve_unknown_barcode, session
+
+
+class ScanJob:
+    """One queued scan. `delta` is the optimistic quantity change shown in the UI.
+
+    `station` names the scanner device that produced it (None for the keyboard/Tk scanner).
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, mode: str, barcode: str, station: Optional[str] = None):
+        self.job_id = next(self._ids)
+        self.mode = mode
+        self.barcode = barcode
+        self.station = station
+        self.delta = 1 if mode == "add" else -1
+        self.error: Optional[str] = None
+        # Offline catalog data for an unknown barcode, used to prefill manual entry.
+        self.catalog_product: Optional[dict] = None
+        # Set once the resolver has looked at this job's barcode.
+        self.resolved = False
+
+
+class _Resume:
+    """Write-queue marker: the resolver finished with `barcode`; run the jobs parked on it."""
+
+    def __init__(self, barcode: str, product: Optional[dict]):
+        self.barcode = barcode
+        self.product = product
+
+
+class ScanPipeline:
+    """Single-worker write queue plus an unknown-barcode resolver; results are delivered on the Tk thread."""
+
+    def __init__(self, widget, on_result: Callable[[ScanJob, bool, Optional[dict]], None]):
+        self.widget = widget
+        self.on_result = on_result
+        self._jobs: "queue.Queue[ScanJob | _Resume | None]" = queue.Queue()
+        self._resolver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-resolver")
+        # barcode -> jobs parked behind its lookup; only touched by the write worker.
+        self._resolving: dict[str, list[ScanJob]] = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, mode: str, barcode: str, station: Optional[str] = None) -> ScanJob:
+        job = ScanJob(mode, barcode, station)
+        self._jobs.put(job)
+        return job
+
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+    def stop(self) -> None:
+        self._jobs.put(None)
+        self._resolver.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+
+            if isinstance(job, _Resume):
+                parked = self._resolving.pop(job.barcode, [])
+                for parked_job in parked:
+                    parked_job.resolved = True
+                    parked_job.catalog_product = job.product
+                    if not self._process(parked_job):
+                        return
+                continue
+
+            waiting = self._resolving.get(job.barcode)
+            if waiting is not None:
+                waiting.append(job)
+                continue
+
+            if not self._process(job):
+                return
+
+    def _process(self, job: ScanJob) -> bool:
+        """Write one job and deliver its result; False once the widget is gone."""
+        ok, row = False, None
+        try:
+            if job.mode == "add":
+                ok = add_item(job.barcode)
+                if not ok and not job.resolved:
+                    self._hand_off(job)
+                    return True
+            else:
+                ok = remove_item(job.barcode)
+            row = get_pantry_row(job.barcode)
+        except Exception as e:
+            # The page reloads from the DB when a job reports an error.
+            print(f"Scan write failed for {job.barcode} (station {job.station or 'local'}): {e}")
+            job.error = str(e)
+            session.rollback()
+
+        return self._deliver(job, ok, row)
+
+    def _deliver(self, job: ScanJob, ok: bool, row: Optional[dict]) -> bool:
+        try:
+            self.widget.after(0, self.on_result, job, ok, row)
+            return True
+        except Exception:
+            # Widget destroyed; nothing left to update.
+            return False
+
+    # ---------- Unknown barcodes (resolver thread) ----------
+
+    def _hand_off(self, job: ScanJob) -> None:
+        self._resolving[job.barcode] = [job]
+        try:
+            self._resolver.submit(self._resolve, job.barcode)
+        except RuntimeError:
+            # Pipeline stopped.
+            pass
+
+    def _resolve(self, barcode: str) -> None:
+        # Offline catalog / known-miss checks first, network only if worthwhile.
+        product = None
+        try:
+            _outcome, product = resolve_unknown_barcode(barcode)
+        except Exception as e:
+            print(f"Could not resolve unknown barcode {barcode}: {e}")
+            session.rollback()
+        # The parked jobs are written on the write worker, in order; adds succeed
+        # there if the lookup created an item_lookup row and report "not found" otherwise.
+        self._jobs.put(_Resume(barcode, product))
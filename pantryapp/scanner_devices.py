@@ -0,0 +1,222 @@
+"""scanner_devices.py
+
+Optional scanner backends that don't go through Tk at all.
+
+Each configured scanner gets a background thread that reads the device
+directly and decodes whole barcodes, so scans keep arriving no matter which
+window or page has keyboard focus:
+
+  - evdev: a Linux input device (/dev/input/event*, or the stable
+    /dev/input/by-id/... link). The device is grabbed exclusively so its
+    keystrokes are not also typed into whatever window has focus.
+    Needs the `evdev` package.
+  - serial: a scanner in USB-CDC / RS-232 mode (/dev/ttyACM0, COM3, ...).
+    Needs the `pyserial` package.
+
+Scanners are configured in the environment as a comma-separated list of
+station=device entries, e.g.
+
+    PANTRY_SCANNERS=kitchen=/dev/input/by-id/usb-Scanner-event-kbd,garage=serial:/dev/ttyACM0@9600
+
+Barcodes are delivered as on_barcode(barcode, station) on the reader thread.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import threading
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import evdev
+except ImportError:
+    evdev = None
+
+try:
+    import serial
+except ImportError:
+    serial = None
+
+SCANNERS_ENV = "PANTRY_SCANNERS"
+DEFAULT_BAUD = 9600
+RECONNECT_SECONDS = 5.0
+POLL_SECONDS = 1.0
+
+ScannerConfig = Tuple[str, str, str, int]  # (station, kind, device, baud)
+
+
+def parse_scanner_config(value: Optional[str]) -> List[ScannerConfig]:
+    """Parse PANTRY_SCANNERS into (station, "evdev"|"serial", device, baud) tuples."""
+    scanners = []
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        station, sep, spec = entry.partition("=")
+        if not sep or not station.strip() or not spec.strip():
+            print(f"Ignoring scanner entry {entry!r}: expected station=device")
+            continue
+        station, spec = station.strip(), spec.strip()
+
+        kind = "evdev"
+        if spec.startswith("serial:"):
+            kind, spec = "serial", spec[len("serial:"):]
+        elif spec.startswith("evdev:"):
+            spec = spec[len("evdev:"):]
+
+        baud = DEFAULT_BAUD
+        if kind == "serial" and "@" in spec:
+            spec, _at, baud_text = spec.rpartition("@")
+            try:
+                baud = int(baud_text)
+            except ValueError:
+                print(f"Ignoring bad baud rate {baud_text!r} for scanner {station}")
+                baud = DEFAULT_BAUD
+        scanners.append((station, kind, spec, baud))
+    return scanners
+
+
+class _ScannerReader(threading.Thread):
+    """Base reader thread: runs the subclass's `read` loop, reconnecting on error until stopped."""
+
+    def __init__(self, station: str, device: str, on_barcode: Callable[[str, str], None],
+                 read: Callable[[], None]):
+        super().__init__(daemon=True, name=f"scanner-{station}")
+        self.station = station
+        self.device = device
+        self.on_barcode = on_barcode
+        self._read = read
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._read()
+            except Exception as e:
+                print(f"Scanner {self.station} ({self.device}) error: {e}")
+            self._stop_event.wait(RECONNECT_SECONDS)
+
+    def _emit(self, barcode: str) -> None:
+        barcode = barcode.strip()
+        if barcode:
+            self.on_barcode(barcode, self.station)
+
+
+class EvdevScannerReader(_ScannerReader):
+    """Decodes key events from a Linux input device into barcodes."""
+
+    _SHIFT_KEYS = ("KEY_LEFTSHIFT", "KEY_RIGHTSHIFT")
+    _END_KEYS = ("KEY_ENTER", "KEY_KPENTER")
+    _PUNCTUATION = {
+        "KEY_MINUS": ("-", "_"), "KEY_EQUAL": ("=", "+"), "KEY_DOT": (".", ">"),
+        "KEY_SLASH": ("/", "?"), "KEY_SPACE": (" ", " "), "KEY_KPMINUS": ("-", "-"),
+    }
+
+    def __init__(self, station, device, on_barcode):
+        super().__init__(station, device, on_barcode, self._read_events)
+        self._keymap = self._build_keymap()
+
+    @classmethod
+    def _build_keymap(cls):
+        """ecodes value -> (unshifted, shifted) character."""
+        keymap = {}
+        for code, name in evdev.ecodes.KEY.items():
+            for key_name in (name if isinstance(name, list) else [name]):
+                suffix = key_name[len("KEY_"):]
+                if len(suffix) == 1 and suffix.isalnum():
+                    keymap[code] = (suffix.lower(), suffix) if suffix.isalpha() else (suffix, suffix)
+                elif suffix.startswith("KP") and len(suffix) == 3 and suffix[2].isdigit():
+                    keymap[code] = (suffix[2], suffix[2])
+                elif key_name in cls._PUNCTUATION:
+                    keymap[code] = cls._PUNCTUATION[key_name]
+        return keymap
+
+    def _read_events(self) -> None:
+        device = evdev.InputDevice(self.device)
+        try:
+            device.grab()
+            shift = False
+            chars = []
+            while not self._stop_event.is_set():
+                # select() with a timeout so stop() is noticed even when nobody scans.
+                if not select.select([device.fd], [], [], POLL_SECONDS)[0]:
+                    continue
+                for event in device.read():
+                    if event.type != evdev.ecodes.EV_KEY:
+                        continue
+                    name = evdev.ecodes.KEY.get(event.code)
+                    if isinstance(name, list):
+                        name = name[0]
+                    if name in self._SHIFT_KEYS:
+                        shift = event.value != 0
+                        continue
+                    if event.value != 1:  # key down only; ignore release/autorepeat
+                        continue
+                    if name in self._END_KEYS:
+                        self._emit("".join(chars))
+                        chars = []
+                    elif event.code in self._keymap:
+                        chars.append(self._keymap[event.code][1 if shift else 0])
+        finally:
+            try:
+                device.ungrab()
+            except Exception:
+                pass
+            device.close()
+
+
+class SerialScannerReader(_ScannerReader):
+    """Reads CR/LF-terminated barcodes from a serial port."""
+
+    def __init__(self, station, device, on_barcode, baud=DEFAULT_BAUD):
+        super().__init__(station, device, on_barcode, self._read_lines)
+        self.baud = baud
+
+    def _read_lines(self) -> None:
+        with serial.Serial(self.device, self.baud, timeout=POLL_SECONDS) as port:
+            buffer = b""
+            while not self._stop_event.is_set():
+                data = port.read(port.in_waiting or 1)
+                if not data:
+                    continue
+                buffer += data
+                # Scanners end with CR, LF or CRLF depending on their configuration.
+                lines = buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+                buffer = lines.pop()
+                for line in lines:
+                    self._emit(line.decode("ascii", errors="ignore"))
+
+
+class ScannerDevices:
+    """Starts one reader thread per configured scanner."""
+
+    def __init__(self, scanners: List[ScannerConfig], on_barcode: Callable[[str, str], None]):
+        self.readers: List[_ScannerReader] = []
+        for station, kind, device, baud in scanners:
+            if kind == "serial":
+                if serial is None:
+                    print(f"Scanner {station}: install pyserial to read {device}")
+                    continue
+                self.readers.append(SerialScannerReader(station, device, on_barcode, baud))
+            else:
+                if evdev is None:
+                    print(f"Scanner {station}: install evdev to read {device}")
+                    continue
+                self.readers.append(EvdevScannerReader(station, device, on_barcode))
+
+    @classmethod
+    def from_env(cls, on_barcode: Callable[[str, str], None]) -> "ScannerDevices":
+        return cls(parse_scanner_config(os.getenv(SCANNERS_ENV)), on_barcode)
+
+    def start(self) -> None:
+        for reader in self.readers:
+            if not reader.is_alive():
+                reader.start()
+
+    def stop(self) -> None:
+        for reader in self.readers:
+            reader.stop()
@@ -0,0 +1,183 @@
+"""scanner_input.py
+
+Keyboard-wedge barcode scanner capture that does not depend on widget focus.
+
+USB scanners "type" a barcode as a very fast burst of keystrokes ending in
+Return. ScannerInput puts its own bindtag in front of whichever widget has
+focus, so it sees every key before the widget does, and uses inter-key timing
+to tell scanner bursts from human typing:
+
+  - a key arriving more than BURST_GAP_MS after the previous one passes through
+    normally (it might be a person typing);
+  - once a second key follows within BURST_GAP_MS the keys are swallowed (and
+    the first one taken back out of an Entry), so the barcode never lands in a
+    dialog's fields;
+  - Return ending a burst of at least MIN_BARCODE_LENGTH characters completes
+    a barcode and is swallowed too; anything else is given back to the widget.
+
+Completed barcodes go into a FIFO queue and are handed, in order, to the most
+recently registered consumer. While a modal dialog that isn't the consumer's
+own window holds the grab (e.g. UnknownBarcodeDialog under wait_window), the
+queue is held and drained once the dialog closes.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import tkinter as tk
+from typing import Callable
+
+BURST_GAP_MS = 50
+MIN_BARCODE_LENGTH = 6
+FLUSH_DELAY_MS = 150
+DRAIN_RETRY_MS = 150
+MAX_QUEUED = 200
+
+
+def get_scanner_input(root: tk.Misc) -> "ScannerInput":
+    """One ScannerInput per Tk root."""
+    root = root.winfo_toplevel()
+    scanner = getattr(root, "_scanner_input", None)
+    if scanner is None:
+        scanner = ScannerInput(root)
+        root._scanner_input = scanner
+    return scanner
+
+
+class ScannerInput:
+    TAG = "ScannerInput"
+
+    def __init__(self, root: tk.Misc):
+        self.root = root
+        self._buffer: list[str] = []
+        self._burst_widget = None
+        self._swallowing = False
+        self._last_time = None
+        self._flush_job = None
+        self._drain_job = None
+        self._queue: deque = deque(maxlen=MAX_QUEUED)
+        self._consumers: list[tuple[tk.Misc, Callable[[str], None]]] = []
+
+        root.bind_class(self.TAG, "<KeyPress>", self._on_key)
+        root.bind_all("<FocusIn>", self._tag_focus_widget, add="+")
+
+    # ---------- Consumers ----------
+
+    def push_consumer(self, owner: tk.Misc, handler: Callable[[str], None]) -> None:
+        """Route barcodes to `handler` until removed. `owner` is the widget whose window may hold the grab."""
+        self.remove_consumer(handler)
+        self._consumers.append((owner, handler))
+        self._schedule_drain()
+
+    def remove_consumer(self, handler: Callable[[str], None]) -> None:
+        self._consumers = [c for c in self._consumers if c[1] != handler]
+
+    def submit(self, barcode: str) -> None:
+        """Queue a complete barcode (Tk thread only)."""
+        if not self._consumers:
+            # Nobody is listening (e.g. pantry page hidden); drop it.
+            return
+        self._queue.append(barcode)
+        self._schedule_drain()
+
+    # ---------- Key handling ----------
+
+    def _tag_focus_widget(self, event) -> None:
+        widget = event.widget
+        try:
+            tags = widget.bindtags()
+            if self.TAG not in tags:
+                widget.bindtags((self.TAG,) + tags)
+        except (AttributeError, tk.TclError):
+            pass
+
+    def _on_key(self, event):
+        is_return = event.keysym in ("Return", "KP_Enter")
+        if not is_return and (not event.char or not event.char.isprintable()):
+            # Modifier keys (Shift for upper-case digits/letters) don't affect timing.
+            return None
+
+        gap = None if self._last_time is None else event.time - self._last_time
+        self._last_time = event.time
+        fast = gap is not None and 0 <= gap <= BURST_GAP_MS
+
+        if is_return:
+            if self._swallowing and fast and len(self._buffer) >= MIN_BARCODE_LENGTH:
+                barcode = "".join(self._buffer)
+                self._reset_burst()
+                self.submit(barcode)
+                return "break"
+            self._give_back()
+            return None
+
+        if fast and self._buffer:
+            if not self._swallowing:
+                self._take_back_first_char()
+                self._swallowing = True
+            self._buffer.append(event.char)
+            self._schedule_flush()
+            return "break"
+
+        # A pause: maybe a person typing, maybe the first key of a scan.
+        self._give_back()
+        self._buffer = [event.char]
+        self._burst_widget = event.widget
+        return None
+
+    def _take_back_first_char(self) -> None:
+        widget = self._burst_widget
+        try:
+            index = widget.index("insert")
+            if index > 0:
+                widget.delete(index - 1)
+        except (AttributeError, tk.TclError, TypeError):
+            pass
+
+    def _give_back(self) -> None:
+        """A swallowed burst turned out not to be a barcode: return the characters to the widget."""
+        if self._swallowing and self._buffer:
+            try:
+                self._burst_widget.insert("insert", "".join(self._buffer))
+            except (AttributeError, tk.TclError):
+                pass
+        self._reset_burst()
+
+    def _reset_burst(self) -> None:
+        self._buffer = []
+        self._burst_widget = None
+        self._swallowing = False
+        if self._flush_job is not None:
+            self.root.after_cancel(self._flush_job)
+            self._flush_job = None
+
+    def _schedule_flush(self) -> None:
+        if self._flush_job is not None:
+            self.root.after_cancel(self._flush_job)
+        self._flush_job = self.root.after(FLUSH_DELAY_MS, self._on_flush_timeout)
+
+    def _on_flush_timeout(self) -> None:
+        self._flush_job = None
+        self._give_back()
+
+    # ---------- Queue draining ----------
+
+    def _schedule_drain(self) -> None:
+        if self._drain_job is None:
+            self._drain_job = self.root.after(0, self._drain)
+
+    def _grab_blocks(self, owner: tk.Misc) -> bool:
+        grab = self.root.tk.call("grab", "current")
+        if not grab:
+            return False
+        # Compare Tcl paths: messagebox grabs have no Python widget object.
+        grab_top = self.root.tk.call("winfo", "toplevel", grab)
+        return str(grab_top) != str(owner.winfo_toplevel())
+
+    def _drain(self) -> None:
+        self._drain_job = None
+        while self._queue and self._consumers:
+            owner, handler = self._consumers[-1]
+            if self._grab_blocks(owner):
+                self._drain_job = self.root.after(DRAIN_RETRY_MS, self._drain)
+                return
+            handler(self._queue.popleft())
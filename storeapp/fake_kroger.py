@@ -0,0 +1,255 @@
+"""fake_kroger.py
+
+Local stand-in for the Kroger public API, for profiling and regression-testing
+the store app without live credentials.
+
+Serves the anonymized fixtures in storeapp/fixtures/kroger/:
+
+    POST /v1/connect/oauth2/token   client-credentials token (any Basic auth)
+    GET  /v1/locations              nearby stores (filter.limit)
+    GET  /v1/products               term search over the fixture catalog, with
+                                    filter.start / filter.limit paging
+    GET  /images/<name>.png         a tiny placeholder image for every product
+
+Latency and failures can be injected to exercise the client's retry, backoff,
+token-refresh and cancellation paths:
+
+    python -m storeapp.fake_kroger --port 8765 --latency-ms 200 --jitter-ms 100 \\
+        --error-rate 0.05 --error-status 503 --token-ttl 60
+
+then point the app at it:
+
+    KROGER_API_BASE=http://127.0.0.1:8765 HTTP_METRICS=1 python app.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "kroger")
+
+# 1x1 light-grey PNG
+_PLACEHOLDER_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP48OUHAAW0At0gImswAAAAAElFTkSuQmCC"
+)
+
+
+def _load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeKrogerConfig:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503,
+                 token_ttl=1800, max_limit=50, max_start=250):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_ttl = token_ttl
+        self.max_limit = max_limit
+        self.max_start = max_start
+
+
+class FakeKrogerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config=None):
+        super().__init__(address, _Handler)
+        self.config = config or FakeKrogerConfig()
+        self.token_response = _load_fixture("token.json")
+        self.locations = _load_fixture("locations.json")["data"]
+        self.products = _load_fixture("products.json")["data"]
+        self._search_text = [
+            f"{p.get('description', '')} {p.get('brand', '')} {' '.join(p.get('categories', []))}".casefold()
+            for p in self.products
+        ]
+        self._tokens = {}  # access token -> issued at (monotonic)
+        self._token_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def issue_token(self):
+        with self._lock:
+            token = f"fake-token-{next(self._token_ids)}"
+            self._tokens[token] = time.monotonic()
+        return token
+
+    def token_valid(self, token):
+        with self._lock:
+            issued = self._tokens.get(token)
+        return issued is not None and time.monotonic() - issued < self.config.token_ttl
+
+    def search(self, term):
+        needle = term.strip().casefold()
+        return [p for p, text in zip(self.products, self._search_text) if needle and needle in text]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeKrogerServer
+
+    def log_message(self, format, *args):
+        pass
+
+    # ── Plumbing ──────────────────────────────────────────────────────────
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject(self):
+        """Apply configured latency; True when this request should fail instead."""
+        config = self.server.config
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if config.error_rate and random.random() < config.error_rate:
+            status = config.error_status
+            if status == 429:
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self._send_json(status, {"errors": {"reason": "injected failure", "code": f"FAKE-{status}"}})
+            return True
+        return False
+
+    def _authorized(self):
+        auth = self.headers.get("Authorization", "")
+        if auth.startswith("Bearer ") and self.server.token_valid(auth[len("Bearer "):]):
+            return True
+        self._send_json(401, {"error": "invalid_token", "error_description": "token expired or unknown"})
+        return False
+
+    # ── Routes ────────────────────────────────────────────────────────────
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self._inject():
+            return
+        if path != "/v1/connect/oauth2/token":
+            self._send_json(404, {"error": "not_found"})
+            return
+        if not self.headers.get("Authorization", "").startswith("Basic "):
+            self._send_json(401, {"error": "invalid_client"})
+            return
+        payload = dict(self.server.token_response)
+        payload["access_token"] = self.server.issue_token()
+        payload["expires_in"] = self.server.config.token_ttl
+        self._send_json(200, payload)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+        if parts.path.startswith("/images/"):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(_PLACEHOLDER_PNG)))
+            self.end_headers()
+            self.wfile.write(_PLACEHOLDER_PNG)
+            return
+
+        if self._inject():
+            return
+        if parts.path == "/v1/locations":
+            if self._authorized():
+                self._locations(query)
+        elif parts.path == "/v1/products":
+            if self._authorized():
+                self._products(query)
+        else:
+            self._send_json(404, {"error": "not_found"})
+
+    def _paging(self, query, default_limit):
+        config = self.server.config
+        try:
+            limit = int(query.get("filter.limit", default_limit))
+            start = int(query.get("filter.start", 0))
+        except ValueError:
+            return None
+        if not 1 <= limit <= config.max_limit or not 0 <= start <= config.max_start:
+            return None
+        return start, limit
+
+    def _locations(self, query):
+        paging = self._paging(query, 10)
+        if paging is None or not query.get("filter.zipCode.near"):
+            self._send_json(400, {"errors": {"reason": "invalid filter", "code": "FAKE-400"}})
+            return
+        start, limit = paging
+        data = self.server.locations[start:start + limit]
+        self._send_json(200, {"data": data, "meta": {"pagination": {
+            "start": start, "limit": limit, "total": len(self.server.locations)}}})
+
+    def _products(self, query):
+        paging = self._paging(query, 10)
+        if paging is None or not query.get("filter.term"):
+            self._send_json(400, {"errors": {"reason": "invalid filter", "code": "FAKE-400"}})
+            return
+        start, limit = paging
+        matches = self.server.search(query["filter.term"])
+        base = self.server.base_url
+        # Image URLs are stored with a {base} placeholder so they point back at this server.
+        data = json.loads(json.dumps(matches[start:start + limit]).replace("{base}", base))
+        self._send_json(200, {"data": data, "meta": {"pagination": {
+            "start": start, "limit": limit, "total": len(matches)}}})
+
+
+def serve(host="127.0.0.1", port=8765, config=None):
+    """Start a server on a background thread and return it; call shutdown() to stop."""
+    server = FakeKrogerServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Kroger API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="fixed delay added to every API call")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="extra random delay, 0..N ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of API calls that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="status for injected failures (429 adds Retry-After)")
+    parser.add_argument("--token-ttl", type=int, default=1800, help="seconds before issued tokens start getting 401s")
+    args = parser.parse_args(argv)
+
+    config = FakeKrogerConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token_ttl=args.token_ttl,
+    )
+    server = FakeKrogerServer((args.host, args.port), config)
+    print(f"Fake Kroger API on {server.base_url} ({len(server.products)} products); Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# image_loader.py
+#
+# Background product-image pipeline for the store grid.
+#
+# Cards are drawn with a placeholder straight away; each image URL is fetched
+# on a small thread pool through the shared http_client pools, decoded and
+# thumbnailed off the Tk thread (JPEG draft mode decodes at a reduced scale,
+# so the resize is cheap), and written to a disk cache keyed by a hash of the
+# URL. Only the PhotoImage is created on the Tk thread, then handed to the
+# card's callback.
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageTk
+
+import http_client
+
+THUMB_SIZE = (110, 110)
+MAX_WORKERS = 6
+FETCH_TIMEOUT = 5
+
+CACHE_DIR = os.getenv("STORE_IMAGE_CACHE") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "store_image_cache"
+)
+
+
+class ImageLoader:
+    """Public methods are for the Tk thread; callbacks run there too."""
+
+    def __init__(self, widget, size=THUMB_SIZE, workers=MAX_WORKERS, cache_dir=CACHE_DIR):
+        self.widget = widget
+        self.size = size
+        self.cache_dir = cache_dir
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="store-images")
+        self._futures = {}   # url -> Future
+        self._waiters = {}   # url -> [callback]
+        self._lock = threading.Lock()
+
+    def load(self, url, callback):
+        """Call callback(photo) on the Tk thread once url is thumbnailed; never called on failure."""
+        if not url:
+            return
+        self._waiters.setdefault(url, []).append(callback)
+        if url not in self._futures:
+            self._futures[url] = self._pool.submit(self._work, url)
+
+    def cancel(self, url, callback):
+        """Withdraw one load() callback; the fetch itself is cancelled if nobody else is waiting."""
+        waiters = self._waiters.get(url)
+        if not waiters or callback not in waiters:
+            return
+        waiters.remove(callback)
+        if not waiters:
+            del self._waiters[url]
+            future = self._futures.pop(url, None)
+            if future is not None:
+                future.cancel()
+
+    def cancel_pending(self):
+        """Drop every queued load (e.g. the grid was rebuilt); loads already running finish into the disk cache."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._waiters.clear()
+
+    def shutdown(self):
+        self.cancel_pending()
+        self._pool.shutdown(wait=False)
+
+    # ── Worker ────────────────────────────────────────────────────────────
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+    def _work(self, url):
+        try:
+            image = self._read_cached(url)
+            if image is None:
+                image = self._fetch(url)
+        except Exception as e:
+            print(f"Could not load image {url}: {e}")
+            image = None
+        try:
+            self.widget.after(0, self._deliver, url, image)
+        except Exception:
+            # Widget destroyed; nothing left to deliver to.
+            pass
+
+    def _read_cached(self, url):
+        path = self._cache_path(url)
+        try:
+            with Image.open(path) as img:
+                img.load()
+                return img
+        except FileNotFoundError:
+            return None
+        except OSError:
+            # Truncated or corrupt entry; fetch it again.
+            return None
+
+    def _fetch(self, url):
+        r = http_client.get(url, endpoint="kroger image", timeout=FETCH_TIMEOUT)
+        r.raise_for_status()
+        img = Image.open(BytesIO(r.content))
+        # JPEG only: lets libjpeg decode at 1/2, 1/4 or 1/8 scale; a no-op for other formats.
+        img.draft("RGB", self.size)
+        img = img.convert("RGBA")
+        img.thumbnail(self.size, Image.LANCZOS)
+        self._write_cached(url, img)
+        return img
+
+    def _write_cached(self, url, img):
+        path = self._cache_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            img.save(tmp_path, "PNG")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not cache image {url}: {e}")
+
+    # ── Tk thread ─────────────────────────────────────────────────────────
+
+    def _deliver(self, url, image):
+        self._futures.pop(url, None)
+        callbacks = self._waiters.pop(url, [])
+        if image is None or not callbacks:
+            return
+        photo = ImageTk.PhotoImage(image)
+        for callback in callbacks:
+            callback(photo)
@@ -0,0 +1,101 @@
+# kroger_auth.py
+#
+# Shared OAuth2 client-credentials token for the Kroger API.
+#
+# The token is fetched once and reused until shortly before `expires_in`; a
+# background timer refreshes it ahead of expiry so searches never wait on the
+# token endpoint. All threads share one token under a lock, and a request that
+# still gets a 401 (token revoked, clock skew) is retried exactly once with a
+# freshly fetched token.
+
+import base64
+import threading
+import time
+
+import http_client
+
+EXPIRY_MARGIN = 60       # seconds before expiry a cached token stops being used
+REFRESH_AHEAD = 300      # seconds before expiry the background refresh fires
+
+
+def basic_credential(client_id, client_secret):
+    """Base64 "id:secret" for the token endpoint's Basic auth header."""
+    return base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+
+
+class KrogerAuth:
+    def __init__(self, token_url, credential, scope="product.compact"):
+        self.token_url = token_url
+        self.credential = credential
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_timer = None
+
+    # ── Token ─────────────────────────────────────────────────────────────
+
+    def token(self):
+        """A valid access token, fetching one only if the cached token is missing or about to expire."""
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._expires_at - EXPIRY_MARGIN:
+                self._fetch_locked()
+            return self._token
+
+    def invalidate(self, token):
+        """Drop `token` if it is still the cached one (another thread may have refreshed already)."""
+        with self._lock:
+            if self._token == token:
+                self._token = None
+
+    def _fetch_locked(self):
+        # A client-credentials grant is safe to repeat, so let the transport retry it.
+        r = http_client.post(
+            self.token_url,
+            endpoint="kroger token",
+            retries=http_client.MAX_RETRIES,
+            data={"grant_type": "client_credentials", "scope": self.scope},
+            headers={
+                "Authorization": f"Basic {self.credential}",
+                "Content-Type": "application/x-www-form-urlencoded",
+            },
+        )
+        r.raise_for_status()
+        data = r.json()
+        expires_in = float(data.get("expires_in", 1800))
+        self._token = data["access_token"]
+        self._expires_at = time.monotonic() + expires_in
+        self._schedule_refresh(expires_in)
+
+    def _schedule_refresh(self, expires_in):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        delay = max(expires_in - REFRESH_AHEAD, expires_in / 2)
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._fetch_locked()
+        except Exception as e:
+            # The next token() call fetches synchronously instead.
+            print(f"Kroger token refresh failed: {e}")
+
+    # ── Requests ──────────────────────────────────────────────────────────
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method, url, headers=None, **kwargs):
+        """Authorized request through http_client; a 401 invalidates the token and retries once."""
+        for attempt in range(2):
+            token = self.token()
+            r = http_client.request(
+                method, url, headers={**(headers or {}), "Authorization": f"Bearer {token}"}, **kwargs
+            )
+            if r.status_code != 401 or attempt:
+                return r
+            self.invalidate(token)
+        return r
@@ -3,54 +3,67 @@ __all__ = ["StoreApp"]
 import tkinter as tk
 from tkinter import ttk
 from banner import TopBanner
-import requests
 import os
 from dotenv import load_dotenv
-from PIL import Image, ImageTk
-from io import BytesIO
 import threading
+import time
 
 
 # ================= API =================
 
 load_dotenv()
 
-TOKEN_URL = "https://api.kroger.com/v1/connect/oauth2/token"
-LOC_URL = "https://api.kroger.com/v1/locations"
-PROD_URL = "https://api.kroger.com/v1/products"
-
-import base64
+# KROGER_API_BASE points the app at another host, e.g. the local stand-in
+# (python -m storeapp.fake_kroger) for offline profiling and testing.
+API_BASE = os.getenv("KROGER_API_BASE", "https://api.kroger.com").rstrip("/")
+TOKEN_URL = f"{API_BASE}/v1/connect/oauth2/token"
+LOC_URL = f"{API_BASE}/v1/locations"
+PROD_URL = f"{API_BASE}/v1/products"
+
+import http_client
+from storeapp.kroger_auth import KrogerAuth, basic_credential
+from storeapp.store_cache import SEARCH_TTL, get_store_cache
+from storeapp.image_loader import ImageLoader
+from storeapp.unit_price import (
+    annotate_unit_prices, dominant_unit, format_unit_price, unit_price_sort_key,
+)
 
 CLIENT_ID = os.getenv("KROGER_USERNAME")
 CLIENT_SECRET = os.getenv("KROGER_AUTH")
 
+# One token for every search thread; refreshed in the background before it expires.
+kroger_auth = KrogerAuth(TOKEN_URL, basic_credential(CLIENT_ID, CLIENT_SECRET))
+
+
 def bearer_token():
-    creds = f"{CLIENT_ID}:{CLIENT_SECRET}"
-    encoded = base64.b64encode(creds.encode()).decode()
-
-    r = requests.post(
-        TOKEN_URL,
-        data={
-            "grant_type": "client_credentials",
-            "scope": "product.compact",
-        },
-        headers={
-            "Authorization": f"Basic {encoded}",
-            "Content-Type": "application/x-www-form-urlencoded",
-        },
-    )
+    return kroger_auth.token()
+
 
-    #print("STATUS:", r.status_code)
-    #print("RESPONSE:", r.text)
+NEARBY_STORE_LIMIT = 10
 
-    return r.json()["access_token"]
-def get_store(zipcode):
-    r = requests.get(
+
+def nearby_stores(zipcode, cancel=None):
+    """Kroger stores near zipcode, nearest first; cached locally with the chosen locationId."""
+    cached = get_store_cache().get_location(zipcode)
+    if cached:
+        return cached[1]
+    r = kroger_auth.get(
         LOC_URL,
-        params={"filter.zipCode.near": zipcode, "filter.limit": 1},
-        headers={"Authorization": f"Bearer {bearer_token()}"},
+        params={"filter.zipCode.near": zipcode, "filter.limit": NEARBY_STORE_LIMIT},
+        endpoint="kroger locations",
+        cancel=cancel,
     )
-    return r.json()["data"][0]["locationId"]
+    stores = r.json()["data"]
+    if stores:
+        get_store_cache().put_location(zipcode, stores[0]["locationId"], stores)
+    return stores
+
+
+def get_store(zipcode, cancel=None):
+    cached = get_store_cache().get_location(zipcode)
+    if cached:
+        return cached[0]
+    return nearby_stores(zipcode, cancel=cancel)[0]["locationId"]
 
 
 # ================= PRODUCT PARSER =================
@@ -66,16 +79,25 @@ def _extract_number(val):
         return None
 
 
-def search_products(query, location):
-    r = requests.get(
+SEARCH_LIMIT = 30   # products per page
+MAX_START    = 250  # highest filter.start the products API accepts
+
+
+def search_products(query, location, limit=SEARCH_LIMIT, start=0, cancel=None):
+    """One page of parsed products; `start` is the number of results to skip."""
+    params = {
+        "filter.term": query,
+        "filter.locationId": location,
+        "filter.limit": limit,
+        "filter.fulfillment": "ais",
+    }
+    if start:
+        params["filter.start"] = start
+    r = kroger_auth.get(
         PROD_URL,
-        params={
-            "filter.term": query,
-            "filter.locationId": location,
-            "filter.limit": 30,
-            "filter.fulfillment": "ais",
-        },
-        headers={"Authorization": f"Bearer {bearer_token()}"},
+        params=params,
+        endpoint="kroger products",
+        cancel=cancel,
     )
     data = r.json()
     products = []
@@ -152,7 +174,30 @@ def search_products(query, location):
             "image":   image_url,
         })
 
-    return products
+    return annotate_unit_prices(products)
+
+
+def _format_age(seconds):
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{seconds // 60} min ago"
+    if seconds < 86400:
+        return f"{seconds // 3600} h ago"
+    return f"{seconds // 86400} d ago"
+
+
+# ================= GRID =================
+
+GRID_COLUMNS     = 5
+CARD_W, CARD_H   = 190, 260
+CARD_PAD         = 10
+CELL_W, CELL_H   = CARD_W + 2 * CARD_PAD, CARD_H + 2 * CARD_PAD
+BUFFER_ROWS      = 1    # card rows kept bound above and below the viewport
+PREFETCH_SCREENS = 1.5  # fetch the next page when this close (in viewport heights) to the end
+
+BEST_VALUE_MARGIN = 1.25  # "Best Value" keeps unit prices within 25% of the lowest
 
 
 # ================= PALETTE — pantry app colours =================
@@ -177,14 +222,173 @@ FONT_BTN  = ("Segoe UI", 9, "bold")
 
 
 
+class ProductCard:
+    """
+    One recyclable card: the widget tree is built once and show() rebinds it
+    to another product. It lives on the grid canvas as a window item.
+    """
+
+    def __init__(self, canvas, image_loader):
+        self.canvas = canvas
+        self.image_loader = image_loader
+        self.product = None
+        self._image_url = None
+        self._image_callback = None
+        self._photo = None
+
+        self.frame = tk.Frame(
+            canvas,
+            bg=CARD_BG,
+            highlightthickness=1,
+            highlightbackground=BORDER,
+        )
+        self.window = canvas.create_window(
+            0, 0, window=self.frame, anchor="nw", width=CARD_W, height=CARD_H
+        )
+
+        # Image area — soft grey tint like pantry panel inset
+        img_frame = tk.Frame(self.frame, bg="#f0f4f8", height=120)
+        img_frame.pack(fill="x")
+        img_frame.pack_propagate(False)
+
+        # Placeholder until the image loader swaps the thumbnail in
+        self.img_label = tk.Label(img_frame, text="🛒", font=("Segoe UI", 28),
+                                  bg="#f0f4f8", fg=SUBTEXT)
+        self.img_label.pack(expand=True)
+
+        # Sale badge (placed only for promo products)
+        self.sale_badge = tk.Label(
+            self.frame, text=" SALE ",
+            bg=ACCENT_R, fg="white",
+            font=("Segoe UI", 7, "bold"),
+        )
+
+        # Divider
+        tk.Frame(self.frame, bg=BORDER, height=1).pack(fill="x")
+
+        # Info
+        info = tk.Frame(self.frame, bg=CARD_BG, padx=10)
+        info.pack(fill="both", expand=True, pady=(8, 6))
+
+        self.name_label = tk.Label(
+            info,
+            wraplength=160, justify="left",
+            bg=CARD_BG, fg=TEXT,
+            font=FONT_HEAD, anchor="w",
+        )
+        self.name_label.pack(fill="x")
+
+        self.meta_label = tk.Label(
+            info,
+            wraplength=160, justify="left",
+            bg=CARD_BG, fg=SUBTEXT,
+            font=FONT_SUB, anchor="w",
+        )
+        self.meta_label.pack(fill="x", pady=(2, 0))
+
+        # Price row
+        price_frame = tk.Frame(info, bg=CARD_BG)
+        price_frame.pack(fill="x", pady=(6, 0))
+
+        self.price_label = tk.Label(price_frame, bg=CARD_BG, font=FONT_PRC)
+        self.price_label.pack(side="left")
+
+        self.unit_label = tk.Label(price_frame, fg=SUBTEXT, bg=CARD_BG, font=FONT_SUB)
+        self.unit_label.pack(side="right")
+
+        self.regular_label = tk.Label(
+            price_frame,
+            fg=SUBTEXT,
+            bg=CARD_BG,
+            font=("Segoe UI", 9),
+        )
+
+    def move(self, x, y):
+        self.canvas.coords(self.window, x, y)
+        self.canvas.itemconfigure(self.window, state="normal")
+
+    def park(self):
+        """Hide the card and let go of its product and image until it is reused."""
+        self.canvas.itemconfigure(self.window, state="hidden")
+        self.product = None
+        self._set_image_url(None)
+
+    def show(self, p):
+        self.product = p
+        self.name_label.config(text=p["name"])
+        self.meta_label.config(text=f'{p["brand"]}{"  •  " + p["size"] if p["size"] else ""}')
+
+        price_color = SALE_CLR if p["promo"] else TEXT
+        if p["price"] == "N/A":
+            price_color = ACCENT_R
+        self.price_label.config(text=p["price"], fg=price_color)
+        self.unit_label.config(text=format_unit_price(p))
+
+        if p["promo"] and p["regular"]:
+            self.regular_label.config(text=f'  ${p["regular"]:.2f}')
+            self.regular_label.pack(side="left")
+        else:
+            self.regular_label.pack_forget()
+
+        if p["promo"]:
+            self.sale_badge.place(x=6, y=6)
+        else:
+            self.sale_badge.place_forget()
+
+        self._set_image_url(p["image"])
+
+    def _set_image_url(self, url):
+        if url and url == self._image_url and self._photo is not None:
+            return
+        if self._image_callback is not None:
+            self.image_loader.cancel(self._image_url, self._image_callback)
+            self._image_callback = None
+        self._image_url = url
+        self._photo = None
+        self.img_label.config(image="", text="🛒")
+        if url:
+            self._image_callback = lambda photo, url=url: self._on_image(url, photo)
+            self.image_loader.load(url, self._image_callback)
+
+    def _on_image(self, url, photo):
+        if url != self._image_url:
+            return
+        self._image_callback = None
+        self._photo = photo
+        self.img_label.config(image=photo, text="")
+
+
 class StoreApp(tk.Frame):
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.configure(bg=BG_MAIN)
 
-        self.images        = []
         self.last_products = []
         self._active_filter = None
+        self._active_filter_fn = None
+        self._image_loader = ImageLoader(self)
+
+        # Each search gets a generation id and a cancel event; starting a new one
+        # cancels the previous search's HTTP calls, and its late results are dropped.
+        self._search_gen    = 0
+        self._search_cancel = threading.Event()
+
+        # Paging: later pages are fetched as the grid scrolls near its end.
+        self._query        = None
+        self._location     = None
+        self._next_start   = 0
+        self._more         = False
+        self._page_loading = False
+
+        # Virtualized grid: `_view` is what's shown (filtered/sorted products);
+        # cards exist only around the viewport and are recycled through a pool.
+        # Only bound cards hold a PhotoImage, so image memory stays bounded
+        # however many pages are loaded.
+        self._view           = []
+        self._card_at        = {}  # view index -> ProductCard
+        self._free_cards     = []
+        self._content_height = 0
+        self._view_check_pending = False
 
         self.create_ui()
         self.bind("<Configure>", self._on_resize)
@@ -232,6 +436,7 @@ class StoreApp(tk.Frame):
             ("Store Brand", "filter_store_brand"),
             ("Name Brand",  "filter_name_brand"),
             ("Cheapest",    "sort_cheapest"),
+            ("Best Value",  "filter_best_value"),
             ("On Sale",     "filter_sale"),
         ]:
             cmd = getattr(self, cmd_name)
@@ -259,21 +464,16 @@ class StoreApp(tk.Frame):
 
         canvas = tk.Canvas(outer, bg=BG_MAIN, highlightthickness=0)
         scrollbar = tk.Scrollbar(outer, orient="vertical", command=canvas.yview)
-        canvas.configure(yscrollcommand=scrollbar.set)
+
+        def on_yscroll(first, last):
+            scrollbar.set(first, last)
+            self._on_view_changed()
+        canvas.configure(yscrollcommand=on_yscroll)
 
         scrollbar.pack(side="right", fill="y")
         canvas.pack(side="left", fill="both", expand=True)
 
-        self.grid_frame = tk.Frame(canvas, bg=BG_MAIN)
-        self._canvas_window = canvas.create_window((0, 0), window=self.grid_frame, anchor="nw")
-
-        self.grid_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all")),
-        )
-        canvas.bind("<Configure>", lambda e: canvas.itemconfig(
-            self._canvas_window, width=e.width
-        ))
+        canvas.bind("<Configure>", lambda e: self._on_view_changed())
         canvas.bind_all("<MouseWheel>",
             lambda e: canvas.yview_scroll(int(-1 * (e.delta / 120)), "units"))
 
@@ -344,170 +544,261 @@ class StoreApp(tk.Frame):
         if not query or not zipc:
             self.status_var.set("Please enter both a search term and a ZIP code.")
             return
-        self._search_btn.config(state="disabled", text="Searching…")
+        # The button stays live: searching again supersedes the search in flight.
+        self._search_cancel.set()
+        self._image_loader.cancel_pending()
+        self._search_gen   += 1
+        self._search_cancel = threading.Event()
+        self._page_loading  = False
+        self._search_btn.config(text="Searching…")
         self.status_var.set("Fetching results…")
-        threading.Thread(target=self._fetch, args=(query, zipc), daemon=True).start()
+        threading.Thread(
+            target=self._fetch,
+            args=(query, zipc, self._search_gen, self._search_cancel),
+            daemon=True,
+        ).start()
+
+    def _post(self, gen, fn, *args):
+        """Run fn(*args) on the Tk thread, unless search `gen` has been superseded by then."""
+        def deliver():
+            if gen == self._search_gen:
+                fn(*args)
+        try:
+            self.after(0, deliver)
+        except Exception:
+            # Widget destroyed
+            pass
 
-    def _fetch(self, query, zipc):
+    def _fetch(self, query, zipc, gen, cancel):
+        cache  = get_store_cache()
+        cached = None
         try:
-            loc      = get_store(zipc)
-            products = search_products(query, loc)
-            self.after(0, self._on_results, products)
+            loc = get_store(zipc, cancel=cancel)
+            if cancel.is_set():
+                return
+            cached = cache.get_search(query, loc, SEARCH_LIMIT)
+            if cached:
+                # Show cached results at once; past the TTL, refresh prices behind them.
+                products, fetched_at = cached
+                annotate_unit_prices(products)  # entries cached before unit prices existed
+                age = time.time() - fetched_at
+                self._post(gen, self._on_results, query, loc, products, age, age > SEARCH_TTL)
+                if age <= SEARCH_TTL:
+                    return
+            products = search_products(query, loc, cancel=cancel)
+            cache.put_search(query, loc, SEARCH_LIMIT, products)
+            self._post(gen, self._on_results, query, loc, products, None, False, cached is not None)
+        except http_client.Cancelled:
+            return
         except Exception as ex:
-            self.after(0, lambda: self.status_var.set(f"Error: {ex}"))
-            self.after(0, lambda: self._search_btn.config(state="normal", text="Search"))
+            # `ex` is unbound once the except block ends, so hand the text to the callbacks.
+            msg = str(ex)
+            if cached:
+                self._post(gen, lambda: self.status_var.set(
+                    f"{len(self.last_products)} cached result(s) shown; refresh failed: {msg}"))
+                return
+            self._post(gen, lambda: self.status_var.set(f"Error: {msg}"))
+            self._post(gen, lambda: self._search_btn.config(text="Search"))
+
+    def _on_results(self, query, location, products, cache_age=None, refreshing=False, refreshed=False):
+        self._search_btn.config(text="Search")
+        if refreshed:
+            # Background refresh of the first page: later pages already loaded stay,
+            # and so does the scroll position.
+            self.last_products[:SEARCH_LIMIT] = products
+            status = self._refresh_view()
+            if status:
+                self.status_var.set(f"{status} Prices updated.")
+            else:
+                self.status_var.set(f"{len(self.last_products)} result(s) (prices updated).")
+            return
+
+        self.last_products = list(products)
+        self._query        = query
+        self._location     = location
+        self._next_start   = len(products)
+        self._more         = len(products) >= SEARCH_LIMIT
 
-    def _on_results(self, products):
-        self.last_products  = products
         self._active_filter = None
-        self._search_btn.config(state="normal", text="Search")
+        self._active_filter_fn = None
         count = len(products)
-        self.status_var.set(f"{count} result{'s' if count != 1 else ''} found.")
+        status = f"{count} result{'s' if count != 1 else ''} found"
+        if refreshed:
+            status += " (prices updated)"
+        elif cache_age is not None:
+            status += f" (cached {_format_age(cache_age)}{', refreshing…' if refreshing else ''})"
+        self.status_var.set(status + ".")
         self.show_products(products)
 
+    # ── Paging ────────────────────────────────────────────────────────────
+
+    def _maybe_load_more(self):
+        """Fetch the next page once the viewport is within PREFETCH_SCREENS of the grid's end."""
+        if not self._more or self._page_loading or self._query is None:
+            return
+        height    = self._canvas.winfo_height()
+        remaining = self._content_height - (self._canvas.canvasy(0) + height)
+        if remaining > height * PREFETCH_SCREENS:
+            return
+        self._page_loading = True
+        threading.Thread(
+            target=self._fetch_page,
+            args=(self._query, self._location, self._next_start, self._search_gen, self._search_cancel),
+            daemon=True,
+        ).start()
+
+    def _fetch_page(self, query, location, start, gen, cancel):
+        try:
+            page = search_products(query, location, start=start, cancel=cancel)
+            self._post(gen, self._on_page, start, page)
+        except http_client.Cancelled:
+            return
+        except Exception as ex:
+            msg = str(ex)
+            self._post(gen, self._on_page_failed, msg)
+
+    def _on_page(self, start, page):
+        self._page_loading = False
+        if start != self._next_start:
+            return
+        self.last_products.extend(page)
+        self._next_start += len(page)
+        self._more = len(page) >= SEARCH_LIMIT and self._next_start <= MAX_START
+        if self._active_filter_fn:
+            self.status_var.set(self._refresh_view())
+        else:
+            self._extend_view(page)
+            end = "" if self._more else " (end of results)"
+            self.status_var.set(f"{len(self.last_products)} results loaded{end}.")
+
+    def _on_page_failed(self, msg):
+        # Leave _more set so scrolling retries the page.
+        self._page_loading = False
+        self.status_var.set(f"{len(self.last_products)} results loaded; next page failed: {msg}")
+
     # ── Filters ───────────────────────────────────────────────────────────
+    #
+    # Each filter/sort is a pure function of the loaded products returning
+    # (view, status text), so new pages and background refreshes can re-apply
+    # it without touching the scroll position. Only a filter click (or Clear)
+    # jumps back to the top.
 
     def _apply_filter(self, fn, label):
         self._active_filter = label
-        fn()
+        self._active_filter_fn = fn
+        products, status = fn(self.last_products)
+        self.status_var.set(status)
+        self.show_products(products)
 
     def _clear_filter(self):
         self._active_filter = None
+        self._active_filter_fn = None
         self.show_products(self.last_products)
         self.status_var.set(f"{len(self.last_products)} result(s) — filter cleared.")
 
-    def filter_store_brand(self):
-        r = [p for p in self.last_products if "kroger" in p["brand"].lower()]
-        self.status_var.set(f"{len(r)} store-brand result(s).")
-        self.show_products(r)
-
-    def filter_name_brand(self):
-        r = [p for p in self.last_products if "kroger" not in p["brand"].lower()]
-        self.status_var.set(f"{len(r)} name-brand result(s).")
-        self.show_products(r)
-
-    def sort_cheapest(self):
-        r = sorted(
-            self.last_products,
-            key=lambda p: float(p["price"].replace("$", "")) if p["price"] != "N/A" else 9999,
-        )
-        self.status_var.set("Sorted by price (lowest first).")
-        self.show_products(r)
-
-    def filter_sale(self):
-        r = [p for p in self.last_products if p["promo"]]
-        self.status_var.set(f"{len(r)} on-sale item(s).")
-        self.show_products(r)
+    def _refresh_view(self):
+        """Re-derive the view after last_products changed, in place; returns the filter's status text or None."""
+        status = None
+        if self._active_filter_fn:
+            products, status = self._active_filter_fn(self.last_products)
+        else:
+            products = self.last_products
+        self._view = list(products)
+        self._layout()
+        return status
+
+    def filter_store_brand(self, products):
+        r = [p for p in products if "kroger" in p["brand"].lower()]
+        return r, f"{len(r)} store-brand result(s)."
+
+    def filter_name_brand(self, products):
+        r = [p for p in products if "kroger" not in p["brand"].lower()]
+        return r, f"{len(r)} name-brand result(s)."
+
+    def sort_cheapest(self, products):
+        # Price per unit, so a 64 oz jug and a 16 oz jar compare fairly; results
+        # in another unit family follow, then those with no readable size.
+        unit = dominant_unit(products)
+        r = sorted(products, key=unit_price_sort_key(unit))
+        return r, (f"Sorted by price per {unit} (lowest first)." if unit
+                   else "Sorted by price (lowest first).")
+
+    def filter_best_value(self, products):
+        """Results within BEST_VALUE_MARGIN of the lowest price per unit, cheapest first."""
+        unit = dominant_unit(products)
+        priced = [p for p in products if p["unit"] == unit and p["unit_price"] is not None]
+        if not priced:
+            return [], "No sizes to compare unit prices."
+        limit = min(p["unit_price"] for p in priced) * BEST_VALUE_MARGIN
+        r = sorted((p for p in priced if p["unit_price"] <= limit), key=lambda p: p["unit_price"])
+        return r, f"{len(r)} best-value result(s) per {unit}."
+
+    def filter_sale(self, products):
+        r = [p for p in products if p["promo"]]
+        return r, f"{len(r)} on-sale item(s)."
 
     # ── Grid ──────────────────────────────────────────────────────────────
+    #
+    # Virtualized: the canvas scroll region spans every product in the view,
+    # but card widgets exist only for the visible rows plus BUFFER_ROWS either
+    # side. Scrolling, filtering and sorting rebind those cards to other
+    # products; the widget tree is never rebuilt.
 
     def _on_resize(self, event):
         pass
 
     def show_products(self, products):
-        self.images.clear()
-        for w in self.grid_frame.winfo_children():
-            w.destroy()
-
-        cols = 5
-        for i, p in enumerate(products):
-            self.create_card(p, i // cols, i % cols)
-
-    # ── Image ─────────────────────────────────────────────────────────────
-
-    def load_image(self, url):
-        if not url:
-            return None
-        try:
-            r   = requests.get(url, timeout=5)
-            img = Image.open(BytesIO(r.content)).convert("RGBA")
-            img.thumbnail((110, 110), Image.LANCZOS)
-            tkimg = ImageTk.PhotoImage(img)
-            self.images.append(tkimg)
-            return tkimg
-        except Exception:
-            return None
-
-    # ── Card ──────────────────────────────────────────────────────────────
-
-    def create_card(self, p, row, col):
-        card = tk.Frame(
-            self.grid_frame,
-            bg=CARD_BG,
-            width=190,
-            height=260,
-            highlightthickness=1,
-            highlightbackground=BORDER,
-        )
-        card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-        card.grid_propagate(False)
-
-        # Image area — soft grey tint like pantry panel inset
-        img_frame = tk.Frame(card, bg="#f0f4f8", height=120)
-        img_frame.pack(fill="x")
-        img_frame.pack_propagate(False)
-
-        img = self.load_image(p["image"])
-        if img:
-            tk.Label(img_frame, image=img, bg="#f0f4f8").pack(expand=True)
-        else:
-            tk.Label(img_frame, text="🛒", font=("Segoe UI", 28),
-                     bg="#f0f4f8", fg=SUBTEXT).pack(expand=True)
-
-        # Sale badge
-        if p["promo"]:
-            tk.Label(
-                card, text=" SALE ",
-                bg=ACCENT_R, fg="white",
-                font=("Segoe UI", 7, "bold"),
-            ).place(x=6, y=6)
-
-        # Divider
-        tk.Frame(card, bg=BORDER, height=1).pack(fill="x")
-
-        # Info
-        info = tk.Frame(card, bg=CARD_BG, padx=10)
-        info.pack(fill="both", expand=True, pady=(8, 6))
-
-        tk.Label(
-            info, text=p["name"],
-            wraplength=160, justify="left",
-            bg=CARD_BG, fg=TEXT,
-            font=FONT_HEAD, anchor="w",
-        ).pack(fill="x")
-
-        meta = f'{p["brand"]}{"  •  " + p["size"] if p["size"] else ""}'
-        tk.Label(
-            info, text=meta,
-            wraplength=160, justify="left",
-            bg=CARD_BG, fg=SUBTEXT,
-            font=FONT_SUB, anchor="w",
-        ).pack(fill="x", pady=(2, 0))
-
-        # Price row
-        price_frame = tk.Frame(info, bg=CARD_BG)
-        price_frame.pack(fill="x", pady=(6, 0))
-
-        price_color = SALE_CLR if p["promo"] else TEXT
-        if p["price"] == "N/A":
-            price_color = ACCENT_R
-
-        tk.Label(
-            price_frame,
-            text=p["price"],
-            fg=price_color,
-            bg=CARD_BG,
-            font=FONT_PRC,
-        ).pack(side="left")
-
-        if p["promo"] and p["regular"]:
-            tk.Label(
-                price_frame,
-                text=f'  ${p["regular"]:.2f}',
-                fg=SUBTEXT,
-                bg=CARD_BG,
-                font=("Segoe UI", 9),
-            ).pack(side="left")
+        """Show `products` as the grid's view, from the top."""
+        self._view = list(products)
+        self._canvas.yview_moveto(0)
+        self._layout()
+
+    def _extend_view(self, products):
+        """Extend the view; the scroll position and cards already bound are left alone."""
+        self._view.extend(products)
+        self._layout()
+
+    def _layout(self):
+        rows = -(-len(self._view) // GRID_COLUMNS)
+        self._content_height = rows * CELL_H + CARD_PAD
+        width = max(self._canvas.winfo_width(), GRID_COLUMNS * CELL_W + CARD_PAD)
+        self._canvas.configure(scrollregion=(0, 0, width, self._content_height))
+        self._on_view_changed()
+
+    def _on_view_changed(self):
+        # Scroll events come in bursts; look at the viewport once they settle.
+        if not self._view_check_pending:
+            self._view_check_pending = True
+            self.after_idle(self._check_view)
+
+    def _check_view(self):
+        self._view_check_pending = False
+        self._render_visible()
+        self._maybe_load_more()
+
+    def _render_visible(self):
+        """Bind a card to every view slot in the visible rows (plus buffer) and park the rest."""
+        count   = len(self._view)
+        top     = self._canvas.canvasy(0)
+        bottom  = top + self._canvas.winfo_height()
+        first   = max(0, int(top // CELL_H) - BUFFER_ROWS) * GRID_COLUMNS
+        last    = min(count, (int(bottom // CELL_H) + 1 + BUFFER_ROWS) * GRID_COLUMNS)
+
+        for index in [i for i in self._card_at if not first <= i < last]:
+            card = self._card_at.pop(index)
+            card.park()
+            self._free_cards.append(card)
+
+        for index in range(first, last):
+            product = self._view[index]
+            card = self._card_at.get(index)
+            if card is None:
+                card = self._free_cards.pop() if self._free_cards else ProductCard(self._canvas, self._image_loader)
+                self._card_at[index] = card
+                row, col = divmod(index, GRID_COLUMNS)
+                card.move(CARD_PAD + col * CELL_W, CARD_PAD + row * CELL_H)
+            if card.product is not product:
+                card.show(product)
 
 
 # ================= RUN =================
@@ -0,0 +1,168 @@
+# store_cache.py
+#
+# Local SQLite cache for the store app (the store app doesn't use the
+# household Postgres DB, so this lives in its own file).
+#
+# zip_locations: ZIP code -> nearest Kroger locationId plus the full nearby
+# store list returned by the locations API. A household's ZIP rarely changes
+# and stores don't move, so entries live for LOCATION_TTL and a repeat search
+# goes straight to the product query.
+#
+# search_results: parsed product lists keyed by (normalized query, locationId,
+# limit), kept in memory and on disk. Results younger than SEARCH_TTL are
+# served as-is; older ones (up to SEARCH_MAX_STALE) are still shown at once
+# while the caller refreshes them in the background (stale-while-revalidate).
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_PATH = os.getenv("STORE_CACHE_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "store_cache.db"
+)
+
+LOCATION_TTL = 30 * 24 * 3600  # seconds
+SEARCH_TTL = int(os.getenv("STORE_SEARCH_TTL", 15 * 60))  # seconds
+SEARCH_MAX_STALE = 7 * 24 * 3600
+MEMORY_SEARCHES = 64
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS zip_locations (
+        zipcode     TEXT PRIMARY KEY,
+        location_id TEXT NOT NULL,
+        stores      TEXT NOT NULL,
+        fetched_at  REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS search_results (
+        query       TEXT NOT NULL,
+        location_id TEXT NOT NULL,
+        page_limit  INTEGER NOT NULL,
+        products    TEXT NOT NULL,
+        fetched_at  REAL NOT NULL,
+        PRIMARY KEY (query, location_id, page_limit)
+    )
+    """,
+)
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a search term, used as the cache key."""
+    return " ".join(str(query).casefold().split())
+
+
+class StoreCache:
+    """One connection shared by the search threads, serialized by a lock."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._searches = OrderedDict()  # (query, location_id, limit) -> (products, fetched_at)
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+        return self._conn
+
+    def get_location(self, zipcode, max_age=LOCATION_TTL):
+        """(location_id, stores) for zipcode if cached within max_age seconds, else None."""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT location_id, stores, fetched_at FROM zip_locations WHERE zipcode = ?",
+                    (zipcode,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Store cache read failed: {e}")
+            return None
+        if row is None or time.time() - row[2] > max_age:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put_location(self, zipcode, location_id, stores):
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO zip_locations (zipcode, location_id, stores, fetched_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (zipcode, location_id, json.dumps(stores), time.time()),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Store cache write failed: {e}")
+
+    def get_search(self, query, location_id, limit, max_age=SEARCH_MAX_STALE):
+        """(products, fetched_at) for a search cached within max_age seconds, else None."""
+        key = (normalize_query(query), str(location_id), int(limit))
+        with self._lock:
+            entry = self._searches.get(key)
+            if entry is not None:
+                self._searches.move_to_end(key)
+        if entry is None:
+            try:
+                with self._lock:
+                    row = self._connection().execute(
+                        "SELECT products, fetched_at FROM search_results "
+                        "WHERE query = ? AND location_id = ? AND page_limit = ?",
+                        key,
+                    ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Store cache read failed: {e}")
+                return None
+            if row is None:
+                return None
+            entry = (json.loads(row[0]), row[1])
+            self._remember_search(key, entry)
+        if time.time() - entry[1] > max_age:
+            return None
+        return entry
+
+    def put_search(self, query, location_id, limit, products):
+        key = (normalize_query(query), str(location_id), int(limit))
+        fetched_at = time.time()
+        self._remember_search(key, (products, fetched_at))
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_results "
+                    "(query, location_id, page_limit, products, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (*key, json.dumps(products), fetched_at),
+                )
+                conn.execute(
+                    "DELETE FROM search_results WHERE fetched_at < ?",
+                    (fetched_at - SEARCH_MAX_STALE,),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Store cache write failed: {e}")
+
+    def _remember_search(self, key, entry):
+        with self._lock:
+            self._searches[key] = entry
+            self._searches.move_to_end(key)
+            while len(self._searches) > MEMORY_SEARCHES:
+                self._searches.popitem(last=False)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_store_cache():
+    """Shared cache, created on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = StoreCache()
+        return _cache
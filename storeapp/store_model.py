@@ -1,9 +1,10 @@
 # actual logic of the store app
 
-import requests
 import os
 from dotenv import load_dotenv
 
+from storeapp.kroger_auth import KrogerAuth
+
 # from sqlalchemy.orm import sessionmaker
 # from database import engine
 # from models.store import Store
@@ -14,46 +15,33 @@ from dotenv import load_dotenv
 # Load variables from the .env file (it looks for the file in the current or parent directories by default)
 load_dotenv()
 
-kroger_token_url = "https://api-ce.kroger.com/v1/connect/oauth2/token"
-kroger_location_url = "https://api-ce.kroger.com/v1/locations"
-kroger_product_url = "https://api-ce.kroger.com/v1/products"
+kroger_api_base = os.getenv("KROGER_API_BASE", "https://api-ce.kroger.com").rstrip("/")
+kroger_token_url = f"{kroger_api_base}/v1/connect/oauth2/token"
+kroger_location_url = f"{kroger_api_base}/v1/locations"
+kroger_product_url = f"{kroger_api_base}/v1/products"
 
 kroger_secret = os.getenv("KROGER_AUTH")
 
 #print("Kroger Secret:", kroger_secret)  # This will print the value of KROGER_SECRET to verify it's loaded correctly
 
-def bearer_token():
-    response = requests.post(
-        kroger_token_url,
-        data={
-            "grant_type": "client_credentials",
-            "scope": "product.compact"
-        },
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {kroger_secret}"
-                
-        }
-    )
-    token_data = response.json()
-    access_token = token_data["access_token"]
+# KROGER_AUTH here is the already-encoded Basic credential for the certification environment.
+kroger_auth = KrogerAuth(kroger_token_url, kroger_secret)
 
-    return(access_token)
+def bearer_token():
+    return kroger_auth.token()
 
 def get_store_data(zipcode):
     # This function will give you the locationid of the store closest to the given zipcode.
     #  You can use this locationid to get the store data.
-    response = requests.get(
+    response = kroger_auth.get(
         kroger_location_url,
         params={
             "filter.zipCode.near": zipcode,
             "filter.limit": 1,
             "filter.radiusInMiles": 50
         },
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {bearer_token()}"
-        }
+        headers={"Content-Type": "application/json"},
+        endpoint="kroger-ce locations",
     )
     token_data = response.json()
     location_id = token_data["data"][0]["locationId"]
@@ -62,7 +50,7 @@ def get_store_data(zipcode):
 
 def search_products(query, locationid):
     # This function will search for products based on the query and locationid.
-    response = requests.get(
+    response = kroger_auth.get(
         kroger_product_url,
         params={
             "filter.term": query,
@@ -70,10 +58,8 @@ def search_products(query, locationid):
             "filter.limit": 14,
             "filter.fulfillment": "ais"
         },
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {bearer_token()}"
-        }
+        headers={"Content-Type": "application/json"},
+        endpoint="kroger-ce products",
     )
     token_data = response.json()
     products = []
@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
-import requests
+import http_client
 import os
 from dotenv import load_dotenv
 from PIL import Image, ImageTk
@@ -65,7 +65,7 @@ SECRET = os.getenv("KROGER_AUTH")
 
 def bearer_token():
 
-    r = requests.post(
+    r = http_client.post(
         TOKEN_URL,
         data={
             "grant_type": "client_credentials",
@@ -82,7 +82,7 @@ def bearer_token():
 
 def get_store(zipcode):
 
-    r = requests.get(
+    r = http_client.get(
         LOC_URL,
         params={
             "filter.zipCode.near": zipcode,
@@ -98,7 +98,7 @@ def get_store(zipcode):
 
 def search_products(query, location):
 
-    r = requests.get(
+    r = http_client.get(
         PROD_URL,
         params={
             "filter.term": query,
@@ -315,7 +315,7 @@ class StoreApp(tk.Tk):
 
         try:
 
-            r = requests.get(url)
+            r = http_client.get(url)
 
             img = Image.open(BytesIO(r.content))
 
@@ -0,0 +1,158 @@
+# unit_price.py
+#
+# Package-size parsing and unit-price normalization for Kroger results.
+#
+# parse_size() turns the free-text `size` field ("64 fl oz", "2 lb",
+# "6 ct / 12 fl oz", "12 x 16.9 fl oz", "8 - 0.5 fl oz", "500 g", "pack of 4",
+# "1 dozen") into a quantity
+# in one base unit per family: ounces for weight, fluid ounces for volume,
+# and a plain count for everything sold by the piece. Multi-packs multiply
+# out, so "6 ct / 12 fl oz" is 72 fl oz.
+#
+# annotate_unit_prices() adds the numeric columns the grid sorts and filters
+# on: price_value, size_qty, unit and unit_price. Sizes repeat heavily within
+# a result set, so parsing is memoized and the whole page is one pass.
+
+import re
+from collections import Counter
+from functools import lru_cache
+
+WEIGHT, VOLUME, COUNT = "oz", "fl oz", "ct"
+
+# unit spelling -> (family, factor to the family's base unit)
+_UNITS = {
+    "fl oz": (VOLUME, 1.0),
+    "oz": (WEIGHT, 1.0),
+    "lb": (WEIGHT, 16.0),
+    "g": (WEIGHT, 1 / 28.349523125),
+    "kg": (WEIGHT, 35.27396195),
+    "gal": (VOLUME, 128.0),
+    "qt": (VOLUME, 32.0),
+    "pt": (VOLUME, 16.0),
+    "l": (VOLUME, 33.8140227),
+    "ml": (VOLUME, 0.0338140227),
+    "ct": (COUNT, 1.0),
+    "dozen": (COUNT, 12.0),
+}
+
+_ALIASES = {
+    "floz": "fl oz", "ounce": "oz", "ounces": "oz",
+    "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "gram": "g", "grams": "g",
+    "gallon": "gal", "gallons": "gal", "quart": "qt", "quarts": "qt", "pint": "pt", "pints": "pt",
+    "lt": "l", "ltr": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "count": "ct", "ea": "ct", "each": "ct", "pk": "ct", "pack": "ct",
+    "doz": "dozen", "dz": "dozen",
+}
+
+# Longer spellings first so "fl oz" wins over "oz", "gal" over "g", "lb" over "l".
+_UNIT_PATTERN = "|".join(
+    sorted((re.escape(u) for u in list(_UNITS) + list(_ALIASES)), key=len, reverse=True)
+)
+_AMOUNT = re.compile(rf"(\d+/\d+|\d*\.?\d+)\s*-?\s*({_UNIT_PATTERN})\b")
+_TIMES = re.compile(r"(\d+)\s*[x×]\s*(?=\d)")
+# "8 - 0.5 fl oz": a pack count, a spaced dash, then the size of each unit
+# (unspaced "1-2 lb" is more likely a range and isn't multiplied).
+_DASH_PACK = re.compile(r"(?<![\d.])(\d+)\s+-\s+(?=\d*\.?\d)")
+_PACK_OF = re.compile(r"pack\s+of\s+(\d+)")
+
+
+def _number(text):
+    if "/" in text:
+        num, den = text.split("/")
+        return float(num) / float(den) if float(den) else 0.0
+    return float(text)
+
+
+@lru_cache(maxsize=1024)
+def parse_size(size):
+    """
+    (quantity, unit) in the family's base unit, or None when the size can't be read.
+
+    >>> parse_size("64 fl oz")
+    (64.0, 'fl oz')
+    >>> parse_size("2 lb")
+    (32.0, 'oz')
+    >>> parse_size("6 ct / 12 fl oz")
+    (72.0, 'fl oz')
+    >>> parse_size("12 x 16 fl oz")
+    (192.0, 'fl oz')
+    >>> parse_size("8 - 0.5 fl oz")
+    (4.0, 'fl oz')
+    >>> parse_size("12-oz")
+    (12.0, 'oz')
+    >>> parse_size("1 dozen")
+    (12.0, 'ct')
+    >>> parse_size("pack of 4")
+    (4.0, 'ct')
+    >>> parse_size("each") is None
+    True
+    """
+    text = str(size or "").lower().replace("fl.", "fl").replace("fl oz", "floz")
+    measures, counts = [], []
+
+    for n in _PACK_OF.findall(text):
+        counts.append(float(n))
+    text = _PACK_OF.sub(" ", text)
+    for pattern in (_TIMES, _DASH_PACK):
+        for n in pattern.findall(text):
+            counts.append(float(n))
+        text = pattern.sub(" ", text)
+
+    for amount, unit in _AMOUNT.findall(text):
+        family, factor = _UNITS[_ALIASES.get(unit, unit)]
+        qty = _number(amount) * factor
+        if qty <= 0:
+            continue
+        if family == COUNT:
+            counts.append(qty)
+        else:
+            measures.append((family, qty))
+
+    if measures:
+        # "16 oz (1 lb)" restates the first measure; only the first one counts.
+        family, qty = measures[0]
+        return qty * (counts[0] if counts else 1.0), family
+    if counts:
+        return counts[0], COUNT
+    return None
+
+
+def annotate_unit_prices(products):
+    """Add price_value, size_qty, unit and unit_price (numbers, or None) to each product in place."""
+    for p in products:
+        price = p.get("promo") or p.get("regular")
+        parsed = parse_size(p.get("size") or "")
+        p["price_value"] = price
+        if parsed is None or price is None:
+            p["size_qty"] = parsed[0] if parsed else None
+            p["unit"] = parsed[1] if parsed else None
+            p["unit_price"] = None
+        else:
+            p["size_qty"], p["unit"] = parsed
+            p["unit_price"] = price / parsed[0]
+    return products
+
+
+def dominant_unit(products):
+    """The unit most results are priced in, so unlike units aren't compared against each other."""
+    units = Counter(p["unit"] for p in products if p.get("unit_price") is not None)
+    return units.most_common(1)[0][0] if units else None
+
+
+def unit_price_sort_key(unit):
+    """Sort key: priced-per-`unit` results by unit price, then other units, then sticker price only."""
+    def key(p):
+        unit_price = p.get("unit_price")
+        if unit_price is not None:
+            return (0 if p["unit"] == unit else 1, unit_price)
+        price = p.get("price_value")
+        return (2, price if price is not None else float("inf"))
+    return key
+
+
+def format_unit_price(p):
+    unit_price = p.get("unit_price")
+    if unit_price is None:
+        return ""
+    return f"${unit_price:.2f}/{p['unit']}" if unit_price >= 0.1 else f"{unit_price * 100:.1f}¢/{p['unit']}"